@@ -0,0 +1,333 @@
+"""
+Mocked OpenAI, SerpAPI and Jina backends for benchmarks.
+
+`MockBackend` is an httpx transport handler that plays a scripted research session:
+the planner searches, visits the result pages, optionally reflects into sub-tasks
+and answers. Structured calls (rewrite, summarize, evaluate) and embeddings get
+well-formed canned responses. Every response waits a fixed, configurable latency
+so the benchmarks measure orchestration, not the network.
+"""
+
+import asyncio
+import base64
+from collections import Counter
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, List
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import httpx
+import numpy as np
+
+EMBEDDING_DIMENSIONS = 256
+
+
+def _page(url: str, size: int) -> str:
+    paragraph = (
+        f"Market update from [{url}]({url}): the S&P 500 moved on earnings, "
+        "rates and macro data. See [analysis](https://example.com/analysis) "
+        "and [charts](https://example.com/charts) for details.\n\n"
+    )
+    return (paragraph * (size // len(paragraph) + 1))[:size]
+
+
+def _vector(text: str) -> np.ndarray:
+    seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:4], "big")
+    return np.random.default_rng(seed).standard_normal(EMBEDDING_DIMENSIONS).astype(
+        np.float32
+    )
+
+
+class MockBackend:
+    def __init__(
+        self,
+        latency: Dict[str, float] | None = None,
+        page_size: int = 20_000,
+        results_per_query: int = 10,
+        reflect: bool = True,
+    ):
+        self.latency = {
+            "planner": 0.05,
+            "structured": 0.03,
+            "embedding": 0.01,
+            "search": 0.05,
+            "fetch": 0.1,
+            **(latency or {}),
+        }
+        self.page_size = page_size
+        self.results_per_query = results_per_query
+        self.reflect = reflect
+        self.requests: Counter[str] = Counter()
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        host, path = request.url.host, request.url.path
+        if host == "r.jina.ai":
+            return await self._respond("fetch", self._jina(request))
+        if host == "serpapi.com":
+            return await self._respond("search", self._serp(request))
+        body = json.loads(await request.aread())
+        if path.endswith("/embeddings"):
+            return await self._respond("embedding", self._embeddings(body))
+        if path.endswith("/chat/completions"):
+            if body.get("tools"):
+                if body.get("stream"):
+                    return await self._respond_stream("planner", self._planner(body))
+                return await self._respond("planner", self._planner(body))
+            return await self._respond("structured", self._structured(body))
+        return httpx.Response(404, json={"error": f"unexpected request {path}"})
+
+    async def _respond(self, kind: str, payload: Dict[str, Any]) -> httpx.Response:
+        self.requests[kind] += 1
+        await asyncio.sleep(self.latency[kind])
+        return httpx.Response(200, json=payload)
+
+    async def _respond_stream(
+        self, kind: str, payload: Dict[str, Any]
+    ) -> httpx.Response:
+        """Serve a completion as server-sent chat.completion.chunk events."""
+        self.requests[kind] += 1
+        await asyncio.sleep(self.latency[kind])
+        choice = payload["choices"][0]
+        message = choice["message"]
+        base = {k: payload[k] for k in ("id", "created", "model")}
+        base["object"] = "chat.completion.chunk"
+
+        def chunk(delta: Dict[str, Any], finish_reason: str | None = None) -> str:
+            data = {
+                **base,
+                "choices": [
+                    {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                ],
+            }
+            return f"data: {json.dumps(data)}\n\n"
+
+        chunks = [chunk({"role": "assistant", "content": ""})]
+        content = message.get("content") or ""
+        chunks += [
+            chunk({"content": content[i : i + 8]}) for i in range(0, len(content), 8)
+        ]
+        for index, call in enumerate(message.get("tool_calls") or []):
+            chunks.append(
+                chunk(
+                    {
+                        "tool_calls": [
+                            {
+                                "index": index,
+                                "id": call["id"],
+                                "type": "function",
+                                "function": {
+                                    "name": call["function"]["name"],
+                                    "arguments": "",
+                                },
+                            }
+                        ]
+                    }
+                )
+            )
+            arguments = call["function"]["arguments"]
+            for i in range(0, len(arguments), 8):
+                delta = {"index": index, "function": {"arguments": arguments[i : i + 8]}}
+                chunks.append(chunk({"tool_calls": [delta]}))
+        chunks.append(chunk({}, choice["finish_reason"]))
+        usage = {**base, "choices": [], "usage": payload["usage"]}
+        chunks.append(f"data: {json.dumps(usage)}\n\n")
+        chunks.append("data: [DONE]\n\n")
+        return httpx.Response(
+            200,
+            content="".join(chunks).encode(),
+            headers={"content-type": "text/event-stream"},
+        )
+
+    def _jina(self, request: httpx.Request) -> Dict[str, Any]:
+        url = str(request.url).removeprefix("https://r.jina.ai/")
+        return {
+            "code": 200,
+            "data": {
+                "title": f"Page {url}",
+                "description": "A page about the market",
+                "content": _page(url, self.page_size),
+            },
+        }
+
+    def _serp(self, request: httpx.Request) -> Dict[str, Any]:
+        query = request.url.params["q"]
+        digest = hashlib.sha256(query.encode()).hexdigest()[:8]
+        return {
+            "organic_results": [
+                {
+                    "title": f"Result {i} for {query}",
+                    "link": f"https://example.com/{digest}/{i}",
+                    "snippet": f"Snippet {i} about {query}. " * 3,
+                }
+                for i in range(self.results_per_query)
+            ]
+        }
+
+    def _embeddings(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        data = []
+        for i, text in enumerate(inputs):
+            vector = _vector(str(text))
+            embedding: Any = (
+                base64.b64encode(vector.tobytes()).decode()
+                if body.get("encoding_format") == "base64"
+                else vector.tolist()
+            )
+            data.append({"object": "embedding", "index": i, "embedding": embedding})
+        tokens = sum(len(str(t)) // 4 + 1 for t in inputs)
+        return {
+            "object": "list",
+            "model": body["model"],
+            "data": data,
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    def _structured(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        schema = body.get("response_format", {}).get("json_schema", {}).get("name", "")
+        if schema == "SearchQueries":
+            user = body["messages"][-1]["content"]
+            count = max(user.count("', '") + 1, 1)
+            content: Any = {
+                "explanation": "more specific",
+                "queries": [f"spx performance aspect {i}" for i in range(count)],
+            }
+        elif schema == "SummarizeResult":
+            content = {
+                "reason": "relevant",
+                "summarize": "The S&P 500 rose on strong earnings and easing yields.",
+                "quotes": ["the S&P 500 moved on earnings"],
+                "datetime": "2025-01-01",
+                "evaluate": "useful",
+            }
+        else:
+            content = {
+                "reason": "good",
+                "is_pass": True,
+                "critic": "",
+                "improvement": "",
+            }
+        return self._completion(json.dumps(content), body, "stop")
+
+    def _planner(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        messages: List[Dict[str, Any]] = body["messages"]
+        query = next(m["content"] for m in messages if m["role"] == "user")
+        turns = sum(
+            1 for m in messages if m["role"] == "assistant" and m.get("tool_calls")
+        )
+        is_root = "focusing on this aspect" not in messages[0]["content"]
+        script = [["search"], ["visit"], ["answer"]]
+        if is_root and self.reflect:
+            script = [["search"], ["visit"], ["reflect"], ["answer"]]
+            if body.get("parallel_tool_calls"):
+                # sub-tasks research other aspects while the pages are read
+                script = [["search"], ["visit", "reflect"], ["answer"]]
+        if turns >= len(script):
+            return self._completion("Done.", body, "stop")
+        digest = hashlib.sha256(query.encode()).hexdigest()[:6]
+        return self._completion(
+            None,
+            body,
+            "tool_calls",
+            tool_calls=[
+                {
+                    "id": f"call_{turns}_{i}_{digest}",
+                    "type": "function",
+                    "function": {
+                        "name": name,
+                        "arguments": json.dumps(
+                            self._arguments(name, query, messages)
+                        ),
+                    },
+                }
+                for i, name in enumerate(script[turns])
+            ],
+        )
+
+    def _arguments(
+        self, name: str, query: str, messages: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        if name == "search":
+            return {"think": "find data", "search_queries": [query, f"{query} news"]}
+        if name == "visit":
+            last = next(
+                m["content"] for m in reversed(messages) if m["role"] == "tool"
+            )
+            urls = re.findall(r"https://example\.com/[0-9a-f]+/\d+", str(last))
+            return {"think": "read the pages", "urls": urls[:3]}
+        if name == "reflect":
+            return {
+                "think": "fill the gaps",
+                "origin_question": query,
+                "questions_to_answer": [
+                    "What drove the SPX recently?",
+                    "How did SPX earnings develop?",
+                ],
+            }
+        return {
+            "think": "enough evidence",
+            "references": [{"url": "https://example.com/a/0", "title": "Result 0"}],
+            "answer": "The SPX rose on strong earnings [^1].",
+        }
+
+    def _completion(
+        self,
+        content: str | None,
+        body: Dict[str, Any],
+        finish_reason: str,
+        tool_calls: List[Dict[str, Any]] | None = None,
+    ) -> Dict[str, Any]:
+        prompt_tokens = len(json.dumps(body["messages"])) // 4
+        completion_tokens = len(content or json.dumps(tool_calls)) // 4
+        message: Dict[str, Any] = {"role": "assistant", "content": content}
+        if tool_calls:
+            message["tool_calls"] = tool_calls
+        return {
+            "id": "chatcmpl-benchmark",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [
+                {"index": 0, "finish_reason": finish_reason, "message": message}
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+
+def install(backend: MockBackend) -> None:
+    """
+    Route every external call of the package (OpenAI, SerpAPI, Jina) to the mock backend.
+    """
+    from agents import (
+        set_default_openai_api,
+        set_default_openai_client,
+        set_tracing_disabled,
+    )
+    from openai import AsyncOpenAI
+
+    from deepsearch_agents.conf import get_configuration
+    from deepsearch_agents.llm import emb, llm
+    from deepsearch_agents.tools._http import set_http_client
+
+    get_configuration().cache_config.enabled = False
+    # the mock has no quotas, waiting on them would only measure the rate limits
+    get_configuration().rate_limits = {}
+    client = AsyncOpenAI(
+        api_key="benchmark",
+        http_client=httpx.AsyncClient(transport=backend.transport()),
+    )
+    llm.client = client
+    emb.client = client
+    set_default_openai_client(client)
+    set_default_openai_api("chat_completions")
+    set_tracing_disabled(True)
+    set_http_client(httpx.AsyncClient(transport=backend.transport()))
@@ -0,0 +1,37 @@
+"""
+Shared reporting for benchmark scripts: results are emitted as JSON, on stdout and
+optionally to the file given with `--output`, so `run_all.py` can collect them.
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+from typing import Any, List
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from deepsearch_agents.log import logger
+
+# keep the benchmark output machine-readable
+logger.setLevel(logging.ERROR)
+
+
+def emit(results: Any) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", help="write the JSON results to this file")
+    args, _ = parser.parse_known_args()
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    print(text)
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(q) - 1]
@@ -0,0 +1,123 @@
+"""
+Benchmark the input tokens of planner turns with and without history compaction.
+
+Replays a planner conversation of alternating search and visit turns, with tool
+outputs sized like real ones, and estimates the input tokens of every turn as sent
+verbatim and as compacted with the `compaction` settings.
+
+Run from the repository root:
+    python benchmarks/bench_compaction.py
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, List
+
+from _report import emit
+
+from agents import RunContextWrapper
+
+from deepsearch_agents.conf import get_configuration
+from deepsearch_agents.context import Knowledge, Reference, build_task_context
+from deepsearch_agents.llm.compaction import compact_history
+from deepsearch_agents.planner import Planner, _build_instructions_and_tools
+from deepsearch_agents.tools import answer, reflect, search, visit
+from deepsearch_agents.tools.search import SearchResult, render_results
+from deepsearch_agents.tools.visit import render_knowledges
+
+QUERY = "How has the SPX performed in the last 30 days?"
+TURNS = 12
+
+
+def _search_output(turn: int) -> str:
+    results = [
+        SearchResult(
+            title=f"Stocks rally as earnings beat expectations, part {turn}.{i}",
+            link=f"https://news.example.com/markets/{turn}/{i}?utm_source=feed",
+            snippet="The S&P 500 rose for a third week as quarterly earnings beat "
+            "analyst expectations and Treasury yields eased from recent highs. " * 2,
+        )
+        for i in range(10)
+    ]
+    return render_results(results)
+
+
+def _visit_output(turn: int) -> str:
+    knowledges = [
+        Knowledge(
+            reference=Reference(
+                url=f"https://news.example.com/markets/{turn}/{i}",
+                title=f"Markets {turn}.{i}",
+                datetime=f"2025-01-0{i + 1}",
+            ),
+            quotes=[],
+            summary="The index gained on strong earnings and easing yields, led by "
+            "technology and financials. " * 4,
+        )
+        for i in range(3)
+    ]
+    return render_knowledges(3, knowledges, [])
+
+
+def _history(turns: int) -> List[Dict[str, Any]]:
+    items: List[Dict[str, Any]] = [{"role": "user", "content": QUERY}]
+    for turn in range(turns):
+        name = "search" if turn % 2 == 0 else "visit"
+        arguments = (
+            {"think": "find recent coverage", "search_queries": [f"SPX week {turn}"]}
+            if name == "search"
+            else {"think": "read the coverage", "urls": ["https://news.example.com"]}
+        )
+        output = _search_output(turn) if name == "search" else _visit_output(turn)
+        call_id = f"call_{turn}"
+        items.append(
+            {
+                "type": "function_call",
+                "call_id": call_id,
+                "name": name,
+                "arguments": json.dumps(arguments),
+            }
+        )
+        items.append(
+            {"type": "function_call_output", "call_id": call_id, "output": output}
+        )
+    return items
+
+
+async def main() -> None:
+    planner_conf = get_configuration().get_model_config("planner")
+    planner = Planner(
+        name="DeepSearch Agent",
+        tools=[search, visit, answer, reflect],
+        task_generator="reflect",
+        model=planner_conf.model_name,
+        model_settings=planner_conf.as_model_settings(),
+    )
+    ctx = RunContextWrapper(context=build_task_context(QUERY))
+    instructions = await _build_instructions_and_tools(ctx, planner)
+
+    compaction_conf = get_configuration().compaction_config
+    history = _history(TURNS)
+    per_turn = []
+    for turn in range(1, TURNS + 1):
+        # the input of a turn: the query and the calls and outputs of earlier turns
+        items = history[: 1 + 2 * (turn - 1)]
+        _, before, after = compact_history(instructions, items, compaction_conf)
+        per_turn.append({"turn": turn, "before": before, "after": after})
+
+    total_before = sum(t["before"] for t in per_turn)
+    total_after = sum(t["after"] for t in per_turn)
+    emit(
+        {
+            "turns": TURNS,
+            "keep_recent_turns": compaction_conf.keep_recent_turns,
+            "digest_tokens": compaction_conf.digest_tokens,
+            "input_tokens_per_turn": per_turn,
+            "input_tokens_total": {"before": total_before, "after": total_after},
+            "input_tokens_saved_ratio": round(1 - total_after / total_before, 3),
+        }
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
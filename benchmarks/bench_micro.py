@@ -0,0 +1,131 @@
+"""
+Micro-benchmarks of hot helpers in the research loop.
+
+- `pick_content` on a large page (embeddings served by the mock backend, no latency)
+- `remove_markdown_link` on large pages
+- `Task.list_out_knowledge` with many knowledge items
+- `_build_instructions_and_tools` for the planner
+- `TaskContext.usage` with many tasks
+
+Run from the repository root:
+    python benchmarks/bench_micro.py
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict
+
+from _mock import MockBackend, _page, install
+from _report import emit
+
+from agents import RunContextWrapper, Usage
+
+from deepsearch_agents.conf import get_configuration
+from deepsearch_agents.context import (
+    Knowledge,
+    Reference,
+    Task,
+    TaskContext,
+    build_task_context,
+)
+from deepsearch_agents.planner import Planner, _build_instructions_and_tools
+from deepsearch_agents.tools import answer, reflect, search, visit
+from deepsearch_agents.tools._utils import remove_markdown_link
+from deepsearch_agents.tools.knowledge import index_knowledge
+from deepsearch_agents.tools.pick import pick_content
+
+QUERY = "How has the SPX performed in the last 30 days?"
+
+
+def _time(fn: Callable[[], Any], number: int, repeat: int = 3) -> Dict[str, float]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return {"per_call_ms": round(best * 1000, 4), "calls": number}
+
+
+async def _time_async(
+    fn: Callable[[], Any], number: int, repeat: int = 3
+) -> Dict[str, float]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            await fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return {"per_call_ms": round(best * 1000, 4), "calls": number}
+
+
+def _context(tasks: int, knowledges: int) -> TaskContext:
+    context = build_task_context(QUERY)
+    root = context.current_task()
+    root.usage = Usage(requests=1, input_tokens=100, output_tokens=10, total_tokens=110)
+    root.knowledges = [
+        Knowledge(
+            reference=Reference(url=f"https://example.com/{i}", title=f"Page {i}"),
+            quotes=[f"quote {i}"] * 3,
+            summary=f"Summary of page {i}. " * 5,
+        )
+        for i in range(knowledges)
+    ]
+    for i in range(tasks - 1):
+        task = Task(origin_query=QUERY, query=f"sub question {i}", parent=root)
+        task.usage = Usage(
+            requests=1, input_tokens=100, output_tokens=10, total_tokens=110
+        )
+        context.tasks[task.id] = task
+    return context
+
+
+async def main() -> None:
+    install(MockBackend(latency={k: 0.0 for k in MockBackend().latency}))
+    results: Dict[str, Any] = {}
+
+    ctx = RunContextWrapper(context=_context(tasks=1, knowledges=0))
+    for size in [100_000, 500_000]:
+        page = _page("https://example.com/page", size)
+        results[f"pick_content_{size // 1000}k_chars"] = await _time_async(
+            lambda: pick_content(ctx, page, max_length=20_000, window_step=10),
+            number=3,
+        )
+
+    for size in [100_000, 1_000_000]:
+        page = _page("https://example.com/page", size)
+        results[f"remove_markdown_link_{size // 1000}k_chars"] = _time(
+            lambda: remove_markdown_link(page), number=5
+        )
+
+    for count in [10, 200]:
+        task = _context(tasks=1, knowledges=count).current_task()
+        results[f"list_out_knowledge_{count}"] = _time(
+            task.list_out_knowledge, number=50
+        )
+
+    planner_conf = get_configuration().get_model_config("planner")
+    planner = Planner(
+        name="DeepSearch Agent",
+        tools=[search, visit, answer, reflect],
+        task_generator="reflect",
+        model=planner_conf.model_name,
+        model_settings=planner_conf.as_model_settings(),
+    )
+    ctx = RunContextWrapper(context=_context(tasks=1, knowledges=20))
+    await index_knowledge(ctx, ctx.context.current_task().knowledges)
+    results["build_instructions_and_tools"] = await _time_async(
+        lambda: _build_instructions_and_tools(ctx, planner), number=200
+    )
+
+    for count in [10, 500]:
+        context = _context(tasks=count, knowledges=0)
+        results[f"task_context_usage_{count}_tasks"] = _time(
+            context.usage, number=200
+        )
+
+    emit(results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
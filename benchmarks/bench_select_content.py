@@ -0,0 +1,96 @@
+"""
+Benchmark token-budgeted content selection before summarize.
+
+Builds large synthetic markdown pages, runs `select_content` with the summarize
+budget from settings.yaml against a local stand-in for the embeddings API, and
+reports the input tokens sent per summarize call before and after selection.
+
+Run from the repository root:
+    python benchmarks/bench_select_content.py
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from _report import emit
+
+from agents import RunContextWrapper
+import numpy as np
+
+from deepsearch_agents.conf import get_configuration
+from deepsearch_agents.context import build_task_context
+from deepsearch_agents.llm import emb
+from deepsearch_agents.tools.pick import select_content
+from deepsearch_agents.tools.summarize import content_token_budget
+
+PAGE_SIZES = [50_000, 200_000, 500_000]
+QUERY = "How has the SPX performed in the last 30 days?"
+
+
+class _Embeddings:
+    """Deterministic pseudo-embeddings derived from the text hash."""
+
+    async def create(self, model: str, input: list[str]):
+        data = []
+        for text in input:
+            seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:4], "big")
+            vector = np.random.default_rng(seed).standard_normal(256)
+            data.append(SimpleNamespace(embedding=vector.tolist()))
+        tokens = sum(len(t) // 4 for t in input)
+        return SimpleNamespace(
+            data=data,
+            usage=SimpleNamespace(prompt_tokens=tokens, total_tokens=tokens),
+        )
+
+
+def _page(size: int) -> str:
+    paragraph = (
+        "The S&P 500 index moved on earnings, rates and macro data this week. "
+        "Analysts pointed to mega-cap tech and treasury yields as key drivers.\n\n"
+    )
+    return (paragraph * (size // len(paragraph) + 1))[:size]
+
+
+async def main() -> None:
+    config = get_configuration()
+    config.cache_config.enabled = False
+    emb.client = SimpleNamespace(embeddings=_Embeddings())  # type: ignore
+    ctx = RunContextWrapper(context=build_task_context(QUERY))
+    budget = content_token_budget(QUERY, QUERY)
+    assert budget is not None, "summarize.max_input_tokens is not configured"
+    model_name = config.get_model_config("summarize").model_name
+
+    report = []
+    for size in PAGE_SIZES:
+        start = time.perf_counter()
+        selected = await select_content(
+            ctx,
+            _page(size),
+            budget,
+            config.visit_config.region_length,
+            model_name,
+            config.visit_config.max_ranked_chars,
+        )
+        report.append(
+            {
+                "page_chars": size,
+                "budget_tokens": budget,
+                "original_tokens": selected.original_tokens,
+                "selected_tokens": selected.selected_tokens,
+                "saved_tokens": selected.saved_tokens,
+                "reduction": round(
+                    selected.original_tokens / max(selected.selected_tokens, 1), 1
+                ),
+                "select_ms": round((time.perf_counter() - start) * 1000, 1),
+            }
+        )
+    emit(report)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
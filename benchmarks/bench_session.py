@@ -0,0 +1,184 @@
+"""
+End-to-end benchmark of main-style research sessions against mocked backends.
+
+Runs the Planner with the same tools, hooks and settings as `main.py` while every
+OpenAI, SerpAPI and Jina request is served by `_mock.MockBackend`. Reports wall-clock
+time, planner turns, tokens per tool, fetches per answer and event-loop lag.
+
+Run from the repository root:
+    python benchmarks/bench_session.py [--sessions 3] [--concurrency 1] [--no-reflect] [--sequential]
+"""
+
+import argparse
+import asyncio
+from collections import defaultdict
+import time
+from typing import Any, Dict, List
+
+from _mock import MockBackend, install
+from _report import emit, percentile
+
+from agents import Agent, RunContextWrapper, Runner, Tool
+
+from deepsearch_agents.conf import get_configuration
+from deepsearch_agents.context import TaskContext, build_task_context
+from deepsearch_agents.hooks import Hooks
+from deepsearch_agents.llm.scheduler import scheduler_stats
+from deepsearch_agents.session import build_planner
+
+QUERY = "How has the SPX performed in the last 30 days? What specific reasons have driven the market recently?"
+
+
+class BenchmarkHooks(Hooks):
+    """Hooks of `main.py`, plus the token usage of every tool call."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.tokens_per_tool: Dict[str, int] = defaultdict(int)
+        self.calls_per_tool: Dict[str, int] = defaultdict(int)
+        self._started: Dict[tuple[int, str], int] = {}
+
+    async def on_tool_start(
+        self,
+        ctx: RunContextWrapper[TaskContext],
+        agent: Agent[TaskContext],
+        tool: Tool,
+    ) -> None:
+        await super().on_tool_start(ctx, agent, tool)
+        self._started[(id(ctx.usage), tool.name)] = ctx.usage.total_tokens
+
+    async def on_tool_end(
+        self,
+        ctx: RunContextWrapper[TaskContext],
+        agent: Agent[TaskContext],
+        tool: Tool,
+        result: str,
+    ) -> None:
+        started = self._started.pop((id(ctx.usage), tool.name), ctx.usage.total_tokens)
+        self.tokens_per_tool[tool.name] += ctx.usage.total_tokens - started
+        self.calls_per_tool[tool.name] += 1
+        await super().on_tool_end(ctx, agent, tool, result)
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up a task sleeping at a fixed interval."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.lags: List[float] = []
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(time.perf_counter() - start - self.interval, 0.0))
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> Dict[str, float]:
+        assert self._task is not None
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        return {
+            "max_ms": round(max(self.lags, default=0.0) * 1000, 2),
+            "p95_ms": round(percentile(self.lags, 95) * 1000, 2),
+        }
+
+
+async def run_session(query: str) -> Dict[str, Any]:
+    config = get_configuration()
+    context = build_task_context(query)
+    hooks = BenchmarkHooks()
+    planner = build_planner(hooks)
+    start = time.perf_counter()
+    await Runner.run(
+        starting_agent=planner,
+        input=query,
+        context=context,
+        max_turns=config.execution_config.max_turns,
+    )
+    return {
+        "wall_s": time.perf_counter() - start,
+        "tasks": len(context.tasks),
+        "tool_turns": sum(task.turn for task in context.tasks.values()),
+        "total_tokens": context.usage().total_tokens,
+        "tokens_per_tool": dict(hooks.tokens_per_tool),
+        "calls_per_tool": dict(hooks.calls_per_tool),
+        "answered": context.final_answer() is not None,
+    }
+
+
+async def main(sessions: int, concurrency: int, reflect: bool, parallel: bool) -> None:
+    backend = MockBackend(reflect=reflect)
+    install(backend)
+    get_configuration().get_model_config("planner").parallel_tool_calls = parallel
+    monitor = LoopLagMonitor()
+    monitor.start()
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded() -> Dict[str, Any]:
+        async with semaphore:
+            return await run_session(QUERY)
+
+    start = time.perf_counter()
+    # each session runs in its own task, so its current task id stays isolated
+    results = await asyncio.gather(
+        *[asyncio.create_task(bounded()) for _ in range(sessions)]
+    )
+    total = time.perf_counter() - start
+    lag = await monitor.stop()
+
+    walls = [r["wall_s"] for r in results]
+    tokens_per_tool: Dict[str, int] = defaultdict(int)
+    answers = 0
+    for r in results:
+        for name, tokens in r["tokens_per_tool"].items():
+            tokens_per_tool[name] += tokens
+        answers += r["calls_per_tool"].get("answer", 0)
+    emit(
+        {
+            "sessions": sessions,
+            "concurrency": concurrency,
+            "total_wall_s": round(total, 3),
+            "session_wall_s": {
+                "mean": round(sum(walls) / len(walls), 3),
+                "max": round(max(walls), 3),
+            },
+            "parallel_tool_calls": parallel,
+            "planner_turns": backend.requests["planner"],
+            "tool_turns": sum(r["tool_turns"] for r in results),
+            "tokens_total": sum(r["total_tokens"] for r in results),
+            "tokens_per_tool": dict(tokens_per_tool),
+            "requests": dict(backend.requests),
+            "fetches_per_answer": round(
+                backend.requests["fetch"] / max(answers, 1), 2
+            ),
+            "answered": sum(r["answered"] for r in results),
+            "event_loop_lag": lag,
+            "scheduler": scheduler_stats(),
+        }
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument(
+        "--no-reflect", action="store_true", help="don't branch into sub-tasks"
+    )
+    parser.add_argument(
+        "--sequential",
+        action="store_true",
+        help="one action per planner turn (parallel_tool_calls off)",
+    )
+    args, _ = parser.parse_known_args()
+    asyncio.run(
+        main(args.sessions, args.concurrency, not args.no_reflect, not args.sequential)
+    )
@@ -0,0 +1,98 @@
+"""
+Benchmark the tokens of tool results returned to the planner.
+
+Compares the compact rendering of search and visit results with the previous one:
+search results handed back as a list of models (which the SDK stringifies, repeating
+every field name and empty fields on every result), and the indented free-form
+visit text.
+
+Run from the repository root:
+    python benchmarks/bench_tool_output.py
+"""
+
+from typing import Dict, List
+
+from _report import emit
+
+from deepsearch_agents.conf import get_configuration
+from deepsearch_agents.context import Knowledge, Reference
+from deepsearch_agents.llm.tokens import count_tokens
+from deepsearch_agents.tools.search import SearchResult, render_results
+from deepsearch_agents.tools.visit import render_knowledges
+
+
+def _search_results(count: int) -> List[SearchResult]:
+    return [
+        SearchResult(
+            title=f"Stocks rally as earnings beat expectations ({i})",
+            link=f"https://news.example.com/markets/2025/01/{i}/stocks-rally-earnings",
+            snippet="The S&P 500 rose for a third straight week as quarterly earnings "
+            "beat analyst expectations and Treasury yields eased from recent highs, "
+            "with technology and financial shares leading the gains.",
+            date="Jan 10, 2025" if i % 3 == 0 else None,
+            source=None,
+        )
+        for i in range(count)
+    ]
+
+
+def _knowledges(count: int) -> List[Knowledge]:
+    return [
+        Knowledge(
+            reference=Reference(
+                url=f"https://news.example.com/markets/2025/01/{i}/stocks-rally-earnings",
+                title=f"Stocks rally ({i})",
+                datetime="2025-01-10",
+            ),
+            quotes=["the S&P 500 moved on earnings"],
+            summary="The index gained 2.1% over the month on strong earnings and easing "
+            "yields, led by technology and financials, while energy lagged.",
+        )
+        for i in range(count)
+    ]
+
+
+def _previous_visit_output(visited: int, knowledges: List[Knowledge]) -> str:
+    content_str = "\n".join(
+        [
+            f"URL: {k.reference.url}\nPublication Date: {k.reference.datetime}\nSummary: {k.summary}"
+            for k in knowledges
+        ]
+    )
+    return f"""
+        Successfully visited {visited} URLs, {len(knowledges)} of them contain clues to answer the question.
+        Here are the details:
+        {content_str}
+        """
+
+
+def _compare(before: str, after: str, model_name: str) -> Dict[str, float]:
+    before_tokens = count_tokens(before, model_name)
+    after_tokens = count_tokens(after, model_name)
+    return {
+        "before_tokens": before_tokens,
+        "after_tokens": after_tokens,
+        "saved_ratio": round(1 - after_tokens / before_tokens, 3),
+    }
+
+
+def main() -> None:
+    model_name = get_configuration().get_model_config("planner").model_name
+    results: Dict[str, Dict[str, float]] = {}
+    for count in [10, 25]:
+        search_results = _search_results(count)
+        results[f"search_{count}_results"] = _compare(
+            str(search_results), render_results(search_results), model_name
+        )
+    for count in [3, 5]:
+        knowledges = _knowledges(count)
+        results[f"visit_{count}_knowledges"] = _compare(
+            _previous_visit_output(count, knowledges),
+            render_knowledges(count, knowledges, []),
+            model_name,
+        )
+    emit(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark concurrent page fetching in the visit tool.
+
+Serves Jina reader responses from a mock transport with a fixed latency per URL
+and compares fetching the pages of one visit the way `visit` does, all at once
+through the session's URL registry, against fetching the same URLs one after
+another. With a truly concurrent fetch path, the visit latency should be close to
+the slowest single page, not the sum of all pages.
+
+Run from the repository root:
+    python benchmarks/bench_visit_fetch.py
+"""
+
+import asyncio
+import os
+import time
+from typing import List
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from _report import emit
+
+import httpx
+
+from deepsearch_agents.conf import get_configuration
+from deepsearch_agents.context import UrlRegistry
+from deepsearch_agents.tools._http import aclose_http_client, set_http_client
+from deepsearch_agents.tools._utils import canonicalize_url
+from deepsearch_agents.tools.visit import PageContent, fetch_url
+
+LATENCIES = {
+    "https://example.com/a": 0.40,
+    "https://example.com/b": 0.25,
+    "https://example.com/c": 0.60,
+    "https://example.com/d": 0.30,
+    "https://example.com/e": 0.50,
+}
+
+
+async def _handler(request: httpx.Request) -> httpx.Response:
+    target = str(request.url).removeprefix("https://r.jina.ai/")
+    await asyncio.sleep(LATENCIES[target])
+    return httpx.Response(
+        200,
+        json={
+            "code": 200,
+            "data": {
+                "title": target,
+                "description": "",
+                "content": f"content of [{target}]({target})",
+            },
+        },
+    )
+
+
+async def _fetch_visit(urls: List[str]) -> List[PageContent | BaseException]:
+    """Fetch the pages of a visit like `visit` does, each through the session's URL registry"""
+    registry = UrlRegistry()
+    return await asyncio.gather(
+        *[
+            registry.fetch(canonicalize_url(url), lambda url=url: fetch_url(url))
+            for url in urls
+        ],
+        return_exceptions=True,
+    )
+
+
+async def main() -> None:
+    # measure the network path, not the page cache
+    get_configuration().cache_config.enabled = False
+    set_http_client(httpx.AsyncClient(transport=httpx.MockTransport(_handler)))
+    urls = list(LATENCIES)
+
+    start = time.perf_counter()
+    for url in urls:
+        await fetch_url(url)
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = await _fetch_visit(urls)
+    concurrent = time.perf_counter() - start
+    assert not any(isinstance(r, BaseException) for r in results)
+
+    await aclose_http_client()
+    emit(
+        {
+            "pages": len(urls),
+            "sum_of_latencies_s": round(sum(LATENCIES.values()), 3),
+            "slowest_page_s": round(max(LATENCIES.values()), 3),
+            "sequential_s": round(sequential, 3),
+            "concurrent_s": round(concurrent, 3),
+            "speedup": round(sequential / concurrent, 2),
+        }
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
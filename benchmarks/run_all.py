@@ -0,0 +1,129 @@
+"""
+Run every benchmark and collect the results into one JSON report.
+
+Each `bench_*.py` script runs in its own process (the package keeps per-process
+clients and caches) and writes its JSON results to a temporary file. With
+`--baseline`, timings are compared against a previous report and regressions
+beyond `--threshold` make the script exit non-zero.
+
+Run from the repository root:
+    python benchmarks/run_all.py --output bench.json [--baseline previous.json]
+"""
+
+import argparse
+from datetime import datetime, timezone
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any, Dict, Iterator, Tuple
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# metrics where a larger value is a regression
+_TIMING_SUFFIXES = ("_s", "_ms")
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _package_version() -> str | None:
+    try:
+        return version("deepsearch-agents")
+    except PackageNotFoundError:
+        return None
+
+
+def _run(script: str) -> Any:
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        output = f.name
+    try:
+        subprocess.run(
+            [sys.executable, script, "--output", output],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        with open(output) as f:
+            return json.load(f)
+    finally:
+        os.remove(output)
+
+
+def _timings(results: Any, prefix: str = "") -> Iterator[Tuple[str, float]]:
+    if isinstance(results, dict):
+        for key, value in results.items():
+            yield from _timings(value, f"{prefix}.{key}" if prefix else key)
+    elif isinstance(results, list):
+        for i, value in enumerate(results):
+            yield from _timings(value, f"{prefix}[{i}]")
+    elif isinstance(results, (int, float)) and prefix.endswith(_TIMING_SUFFIXES):
+        yield prefix, float(results)
+
+
+def _regressions(
+    current: Dict[str, Any], baseline: Dict[str, Any], threshold: float
+) -> Dict[str, Dict[str, float]]:
+    previous = dict(_timings(baseline["results"]))
+    regressions = {}
+    for key, value in _timings(current["results"]):
+        before = previous.get(key)
+        if before and value > before * (1 + threshold):
+            regressions[key] = {
+                "baseline": before,
+                "current": value,
+                "ratio": round(value / before, 2),
+            }
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--baseline", help="report of a previous version to compare")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="relative slowdown reported as a regression (default 0.2 = 20%%)",
+    )
+    args = parser.parse_args()
+
+    report: Dict[str, Any] = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "version": _package_version(),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "results": {},
+    }
+    for script in sorted(glob.glob(os.path.join(BENCHMARK_DIR, "bench_*.py"))):
+        name = os.path.splitext(os.path.basename(script))[0].removeprefix("bench_")
+        print(f"running {name} ...", file=sys.stderr)
+        report["results"][name] = _run(script)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["regressions"] = _regressions(
+                report, json.load(f), args.threshold
+            )
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    print(text)
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
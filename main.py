@@ -1,105 +1,100 @@
 import argparse
 import asyncio
-from contextlib import asynccontextmanager
-import contextvars
-import uuid
-from agents import (
-    Agent,
-    AgentHooks,
-    RunContextWrapper,
-    Runner,
-    Tool,
-    gen_trace_id,
-    set_default_openai_api,
-    set_default_openai_client,
-    set_tracing_export_api_key,
-    trace,
-)
-from openai import AsyncOpenAI
 
-from deepsearch_agents import conf
+from deepsearch_agents.cache import cache_stats
 from deepsearch_agents.log import logger
-from deepsearch_agents.conf import get_configuration
-from deepsearch_agents.context import Task, TaskContext, build_task_context
-
-from deepsearch_agents.planner import Planner
-from deepsearch_agents.tools import answer, reflect, search, visit
+from deepsearch_agents.batch import run_batch
+from deepsearch_agents.conf import Configuration, get_configuration
+from deepsearch_agents.llm.scheduler import scheduler_stats
+from deepsearch_agents.metrics import registry
+from deepsearch_agents.resilience import hedge_stats
+from deepsearch_agents.session import (
+    SessionResult,
+    configure_openai,
+    run_session,
+    stream_session,
+)
 
 
-class Hooks(AgentHooks[TaskContext]):
-    async def on_start(
-        self,
-        ctx: RunContextWrapper[TaskContext],
-        agent: Agent[TaskContext],
-    ) -> None:
-        ctx.context.current_task().set_usage(ctx.usage)
-        agent.rebuild_tools(ctx)
+async def main():
+    config = get_configuration()
+    configure_openai()
+    parser = argparse.ArgumentParser(description="DeepSearch Agents CLI")
+    parser.add_argument("query", type=str, nargs="?", help="query string to search")
+    parser.add_argument(
+        "--batch", help='JSONL file of {"id": ..., "query": ...} lines to research'
+    )
+    parser.add_argument(
+        "--output",
+        default="results.jsonl",
+        help="JSONL file the batch results are appended to, already answered ids are skipped",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="sessions run at the same time"
+    )
+    parser.add_argument(
+        "--token-budget",
+        type=int,
+        help="total tokens of the batch, no session is started once spent",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="print the progress of the session and the answer as it is written",
+    )
+    args = parser.parse_args()
 
-    async def on_tool_start(
-        self,
-        ctx: RunContextWrapper[TaskContext],
-        _: Agent[TaskContext],
-        tool: Tool,
-    ) -> None:
-        ctx.context.current_task().turn += 1
+    if args.batch:
+        await run_batch(args.batch, args.output, args.concurrency, args.token_budget)
+        _report(config)
+        return
 
-    async def on_tool_end(
-        self,
-        ctx: RunContextWrapper[TaskContext],
-        agent: Agent[TaskContext],
-        tool: Tool,
-        result: str,
-    ) -> None:
-        maximun = conf.get_configuration().execution_config.max_token_usage
-        curr = ctx.context.current_task().usage
+    q = (
+        args.query.strip()
+        if args.query
+        else "How has the SPX performed in the last 30 days? What specific reasons have driven the market recently?"
+    )
+    logger.info(f"query: {q} ")
 
-        total = ctx.context.usage()
-        logger.info(
-            f"finish action {tool.name} result: {result} curr token usage: {curr.total_tokens} ({(curr.total_tokens/maximun):.2%}),"
-            f"total usage: {total.total_tokens} ({(total.total_tokens/maximun):.2%})."
-        )
-        agent.rebuild_tools(ctx, tool.name)
+    if args.stream:
+        session = await _stream(q)
+    else:
+        session = await run_session(q)
+    logger.info(session.final_output)
+    logger.info("final answer----------\n")
+    logger.info(session.answer)
+    logger.info({"ledger": session.ledger, "cost": round(session.cost, 4)})
+    _report(config)
 
 
-async def main():
-    config = get_configuration()
-    client = AsyncOpenAI(
-        base_url=config.openai_base_url if config else None,
-        api_key=config.openai_api_key,
-    )
-    set_default_openai_client(client)
-    set_tracing_export_api_key(config.tracing_openai_api_key)
-    set_default_openai_api("chat_completions")
-    parser = argparse.ArgumentParser(description="DeepSearch Agents CLI")
-    parser.add_argument("query", type=str, help="query string to search")
-    # args = parser.parse_args()
-    # q = args.query.strip()
-    q = "How has the SPX performed in the last 30 days? What specific reasons have driven the market recently?"
-    logger.info(f"query: {q} ")
-    trace_id = gen_trace_id()
+async def _stream(query: str) -> SessionResult:
+    async for event in stream_session(query):
+        if event.type == "answer_delta":
+            print(event.data["delta"], end="", flush=True)
+        elif event.type == "answer_rejected":
+            print("\n[draft rejected, researching further]", flush=True)
+        elif event.type == "task_created":
+            print(f"[task {event.task_id}] {event.data['query']}", flush=True)
+        elif event.type == "tool_start":
+            print(f"[task {event.task_id}] {event.data['tool']}...", flush=True)
+        elif event.type == "knowledge_added":
+            print(
+                f"[task {event.task_id}] + {event.data['reference']['url']}", flush=True
+            )
+        elif event.type == "task_solved":
+            print(f"[task {event.task_id}] solved", flush=True)
+        elif event.type == "session_finished":
+            print(flush=True)
+            return SessionResult.model_validate(event.data)
+    raise RuntimeError("session ended without a result")
 
-    with trace(workflow_name="deepsearch", trace_id=trace_id):
-        context = build_task_context(q)
-        planner_conf = config.get_model_config("planner")
-        logger.info(f"planner_conf: {planner_conf}")
-        planner = Planner(
-            name="DeepSearch Agent",
-            tools=[search, visit, answer, reflect],
-            task_generator="reflect",
-            hooks=Hooks(),
-            model=planner_conf.model_name,
-            model_settings=planner_conf.as_model_settings(),
-        )
 
-        ret = await Runner.run(
-            starting_agent=planner,
-            input=q,
-            context=context,
-            max_turns=config.execution_config.max_turns,
-        )
-    logger.info(ret.final_output)
-    logger.info("final answer----------\n")
-    logger.info(context.final_answer())
+def _report(config: Configuration) -> None:
+    logger.info({"cache_stats": cache_stats()})
+    logger.info({"scheduler_stats": scheduler_stats()})
+    logger.info({"hedge_stats": hedge_stats})
+    metrics_conf = config.metrics_config
+    registry.export(metrics_conf.prometheus_file, metrics_conf.json_file)
 
 
 if __name__ == "__main__":
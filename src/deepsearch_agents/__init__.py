@@ -3,10 +3,16 @@ DeepSearch Agents package.
 """
 
 __all__ = [
+    "cache",
     "conf",
     "context",
+    "hooks",
     "log",
+    "metrics",
     "planner",
+    "resilience",
+    "server",
+    "session",
     "tools",
     "llm",
 ]
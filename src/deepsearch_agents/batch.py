@@ -0,0 +1,120 @@
+import asyncio
+import hashlib
+import json
+import os
+from typing import Iterator, Set, Tuple
+
+from deepsearch_agents.log import logger
+from deepsearch_agents.session import SessionResult, run_session
+
+# statuses retried when a batch is resumed
+_RETRY_STATUSES = {"failed"}
+
+
+def query_id(line: dict) -> str:
+    """
+    The id of a query: its `id` field, or a hash of the query so that it is stable across runs.
+    """
+    if line.get("id") is not None:
+        return str(line["id"])
+    return hashlib.sha256(line["query"].encode()).hexdigest()[:16]
+
+
+def read_queries(path: str) -> Iterator[Tuple[str, str]]:
+    """
+    Read (id, query) pairs from a JSONL file of {"id": ..., "query": ...} lines,
+    a line repeating an id already read is skipped.
+    """
+    seen = set()
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+                id, query = query_id(data), data["query"]
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                logger.error(f"Skipping line {number} of {path}: {e}")
+                continue
+            if id in seen:
+                logger.warning(f"Skipping line {number} of {path}: duplicate id {id}")
+                continue
+            seen.add(id)
+            yield id, query
+
+
+def completed_ids(path: str) -> Set[str]:
+    """
+    Ids already answered in an output file, a partially written last line is ignored.
+    """
+    if not os.path.exists(path):
+        return set()
+    done = set()
+    with open(path) as f:
+        for line in f:
+            try:
+                data = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(data, dict) or data.get("id") is None:
+                continue
+            if data.get("status") not in _RETRY_STATUSES:
+                done.add(str(data["id"]))
+    return done
+
+
+async def run_batch(
+    input_path: str,
+    output_path: str,
+    concurrency: int = 4,
+    token_budget: int | None = None,
+) -> int:
+    """
+    Run every query of a JSONL file and append each result to the output JSONL file as
+    soon as it finishes. Queries already in the output are skipped, so an interrupted
+    batch resumes where it stopped.
+
+    Args:
+        concurrency: Number of sessions running at the same time.
+        token_budget: Total tokens of the batch; once spent, no new session is started.
+
+    Returns:
+        The number of sessions run.
+    """
+    done = completed_ids(output_path)
+    if done:
+        logger.info(f"Resuming batch, {len(done)} queries already answered")
+    queries = (
+        (id, query) for id, query in read_queries(input_path) if id not in done
+    )
+    spent_tokens = 0
+    count = 0
+
+    async def worker(out) -> None:
+        nonlocal spent_tokens, count
+        for id, query in queries:
+            if token_budget is not None and spent_tokens >= token_budget:
+                return
+            session = await run_session(query, SessionResult(id=id, query=query))
+            spent_tokens += session.usage.get("total_tokens", 0)
+            count += 1
+            out.write(session.model_dump_json() + "\n")
+            out.flush()
+            os.fsync(out.fileno())
+            logger.info(
+                f"[{count}] {id}: {session.status} in {session.duration:.1f}s, "
+                f"{session.usage.get('total_tokens', 0)} tokens, batch total {spent_tokens}"
+            )
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "a+") as out:
+        # terminate a line cut short by a crash, so the next result starts on its own line
+        if out.tell() > 0:
+            out.seek(out.tell() - 1)
+            if out.read(1) != "\n":
+                out.write("\n")
+        # a generator shared by the workers hands out each query once
+        await asyncio.gather(*[worker(out) for _ in range(concurrency)])
+    if token_budget is not None and spent_tokens >= token_budget:
+        logger.warning(f"Batch stopped after {count} queries, token budget spent")
+    return count
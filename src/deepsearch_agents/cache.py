@@ -0,0 +1,281 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Tuple
+import zlib
+
+
+@dataclass
+class CacheStats:
+    """
+    Hit/miss counters of a cache.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    miss_seconds: float = 0.0
+    """Total time spent producing values on cache misses, used to estimate the time saved by hits."""
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def estimated_saved_seconds(self) -> float:
+        """Time saved by hits, assuming a hit would have cost an average miss."""
+        if not self.misses:
+            return 0.0
+        return self.hits * self.miss_seconds / self.misses
+
+    def observe_miss_latency(self, seconds: float) -> None:
+        self.miss_seconds += seconds
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            **asdict(self),
+            "hit_rate": self.hit_rate,
+            "estimated_saved_seconds": self.estimated_saved_seconds,
+        }
+
+
+class Cache(ABC):
+    """
+    A key-value cache of bytes. Values expire after `ttl` seconds (None means never).
+    """
+
+    def __init__(self, ttl: float | None = None):
+        self.ttl = ttl
+        self.stats = CacheStats()
+
+    def get(self, key: str) -> bytes | None:
+        entry = self.get_entry(key)
+        return entry[0] if entry else None
+
+    def get_entry(self, key: str) -> Tuple[bytes, float | None] | None:
+        """
+        Get the value and its expiration timestamp (None means never).
+        """
+        entry = self._get(key)
+        if entry is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return entry
+
+    def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        self._set(key, value, time.time() + ttl if ttl is not None else None)
+
+    @abstractmethod
+    def _get(self, key: str) -> Tuple[bytes, float | None] | None: ...
+
+    @abstractmethod
+    def _set(self, key: str, value: bytes, expires_at: float | None) -> None: ...
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+
+class MemoryCache(Cache):
+    """
+    In-process LRU cache, bounded by entry count and/or total bytes.
+    """
+
+    def __init__(
+        self,
+        max_items: int | None = 1024,
+        max_bytes: int | None = None,
+        ttl: float | None = None,
+    ):
+        super().__init__(ttl)
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, Tuple[bytes, float | None]] = OrderedDict()
+        self._size = 0
+
+    def _get(self, key: str) -> Tuple[bytes, float | None] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] < time.time():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _set(self, key: str, value: bytes, expires_at: float | None) -> None:
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, expires_at)
+        self._size += len(value)
+        while self._entries and (
+            (self.max_items is not None and len(self._entries) > self.max_items)
+            or (self.max_bytes is not None and self._size > self.max_bytes)
+        ):
+            self._remove(next(iter(self._entries)))
+            self.stats.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        value, _ = self._entries.pop(key)
+        self._size -= len(value)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+
+class DiskCache(Cache):
+    """
+    Persistent cache in a SQLite file. Values are zlib-compressed, and the least
+    recently used entries are evicted once the stored bytes exceed `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int | None = None,
+        ttl: float | None = None,
+        compress: bool = True,
+    ):
+        super().__init__(ttl)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.compress = compress
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)"
+        )
+        self._conn.commit()
+
+    def _get(self, key: str) -> Tuple[bytes, float | None] | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at < now:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        return (zlib.decompress(value) if self.compress else value), expires_at
+
+    def _set(self, key: str, value: bytes, expires_at: float | None) -> None:
+        now = time.time()
+        stored = zlib.compress(value) if self.compress else value
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (key, stored, len(stored), expires_at, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute(
+            "DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at < ?",
+            (now,),
+        )
+        if self.max_bytes is None:
+            return
+        (total,) = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed_at ASC"
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+
+class TieredCache(Cache):
+    """
+    Chain of caches checked in order, e.g. a memory LRU in front of a disk cache.
+    A hit in a slower tier is promoted to the faster tiers, keeping its expiration.
+    """
+
+    def __init__(self, *tiers: Cache):
+        super().__init__(None)
+        self.tiers = tiers
+
+    def _get(self, key: str) -> Tuple[bytes, float | None] | None:
+        for i, tier in enumerate(self.tiers):
+            entry = tier.get_entry(key)
+            if entry is not None:
+                for faster in self.tiers[:i]:
+                    faster._set(key, entry[0], _earliest(entry[1], faster.ttl))
+                return entry
+        return None
+
+    def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        for tier in self.tiers:
+            tier.set(key, value, ttl)
+
+    def _set(self, key: str, value: bytes, expires_at: float | None) -> None:
+        for tier in self.tiers:
+            tier._set(key, value, _earliest(expires_at, tier.ttl))
+
+    def clear(self) -> None:
+        for tier in self.tiers:
+            tier.clear()
+
+
+def _earliest(expires_at: float | None, ttl: float | None) -> float | None:
+    if ttl is None:
+        return expires_at
+    deadline = time.time() + ttl
+    return deadline if expires_at is None else min(expires_at, deadline)
+
+
+_caches: Dict[str, Cache] = {}
+
+
+def register_cache(name: str, cache: Cache) -> Cache:
+    """
+    Register a cache under a name so its counters show up in `cache_stats`.
+    """
+    _caches[name] = cache
+    return cache
+
+
+def cache_stats() -> Dict[str, Dict[str, float]]:
+    """
+    Hit/miss counters of every registered cache.
+    """
+    return {name: cache.stats.as_dict() for name, cache in _caches.items()}
@@ -22,6 +22,9 @@ class ModelConfig:
     max_tokens: int
     """Maximum number of tokens to generate in the response"""
 
+    max_input_tokens: int | None = None
+    """Maximum number of input tokens to send to the model, inputs are trimmed to fit (None means no limit)"""
+
     temperature: float | None = None
     """Controls randomness in the model's output (0.0 to 2.0)"""
 
@@ -34,6 +37,27 @@ class ModelConfig:
     parallel_tool_calls: bool | None = None
     """Whether to use parallel tool calls when calling the model."""
 
+    cache_responses: bool = False
+    """Whether responses of this model may be served from the response cache"""
+
+    force_response_cache: bool = False
+    """Cache responses even when sampling is non-deterministic (temperature > 0), e.g. for replays"""
+
+    priority: int = 1
+    """Scheduling priority of requests to this model when rate limited, lower values are admitted first"""
+
+    token_budget: bool = True
+    """Whether the tokens of this model count against `execution.max_token_usage`, otherwise only its cost counts against `max_cost`"""
+
+    def is_response_cacheable(self) -> bool:
+        """
+        Responses are cacheable when opted in, and either sampled with temperature 0 or forced.
+        """
+        if not self.cache_responses:
+            return False
+        deterministic = self.temperature is not None and self.temperature <= 0
+        return deterministic or self.force_response_cache
+
     def as_model_settings(self) -> ModelSettings:
         """
         Converts ModelConfig to ModelSettings format used by the agents framework.
@@ -65,6 +89,9 @@ class ExecutionConfig:
     max_token_usage: int = 100_000
     """Maximum token usage for the execution"""
 
+    max_cost: float | None = None
+    """Maximum cost in USD for the execution, priced with `pricing` (None means no limit)"""
+
     max_turns: int = 15
     """Maximum number of turns for the execution"""
 
@@ -76,6 +103,278 @@ class ExecutionConfig:
     # """The maximum number for a **sub-task** to retrieve knowledge before giving an answer."""
 
 
+@dataclass
+class FetchConfig:
+    """
+    Configuration class for outgoing HTTP fetches (Jina reader, SerpAPI).
+    """
+
+    connect_timeout: float = 5.0
+    """Seconds to wait for a connection to be established"""
+
+    read_timeout: float = 30.0
+    """Seconds to wait for a chunk of the response body"""
+
+    max_connections: int = 20
+    """Maximum number of connections in the shared pool"""
+
+    max_keepalive_connections: int = 10
+    """Maximum number of idle keep-alive connections kept in the pool"""
+
+    keepalive_expiry: float = 30.0
+    """Seconds an idle keep-alive connection is kept before being closed"""
+
+    max_concurrency: int = 5
+    """Maximum number of page fetches in flight at the same time"""
+
+
+@dataclass
+class VisitConfig:
+    """
+    Configuration class for the fetch -> pick -> summarize pipeline of the visit tool.
+    """
+
+    pick_concurrency: int = 5
+    """Maximum number of pages being relevance-picked at the same time"""
+
+    summarize_concurrency: int = 3
+    """Maximum number of pages being summarized at the same time"""
+
+    region_length: int = 1_000
+    """Length (in characters) of the regions a page is split into when it exceeds the summarize token budget"""
+
+    max_ranked_chars: int | None = 100_000
+    """Maximum number of characters of a page that are embedded and ranked, the rest of a longer page is dropped (None means no limit)"""
+
+
+@dataclass
+class KnowledgeConfig:
+    """
+    Configuration class for the knowledge put into prompts.
+    """
+
+    top_k: int = 8
+    """Maximum number of knowledge items, most relevant to the task's question first"""
+
+    max_tokens: int = 2_000
+    """Maximum number of tokens of the knowledge items in a prompt"""
+
+
+@dataclass
+class CompactionConfig:
+    """
+    Configuration class for compacting the conversation history re-sent on every planner turn.
+    """
+
+    enabled: bool = True
+
+    keep_recent_turns: int = 2
+    """Number of latest turns whose tool outputs are kept verbatim, older ones are replaced by a digest"""
+
+    digest_tokens: int = 120
+    """Maximum number of tokens of the digest of a tool output"""
+
+    max_input_tokens: int | None = 16_000
+    """Input tokens of a planner turn (instructions and history) above which recent tool outputs are digested too (None means no limit)"""
+
+
+@dataclass
+class ToolOutputConfig:
+    """
+    Configuration class for how tool results are rendered for the planner.
+    """
+
+    snippet_chars: int = 200
+    """Maximum length (in characters) of a search result snippet"""
+
+    max_tokens: dict[str, int] = field(
+        default_factory=lambda: {"search": 1_000, "visit": 1_500}
+    )
+    """Maximum number of tokens of a result by tool name, whole entries beyond it are left out"""
+
+
+@dataclass
+class SearchConfig:
+    """
+    Configuration class for web search settings.
+    """
+
+    timeout: float = 15.0
+    """Seconds a single search query may take before it is dropped"""
+
+    top_k: int = 10
+    """Number of results returned to the planner after reranking"""
+
+    diversity: float = 0.5
+    """Weight (0 to 1) of the dissimilarity to the results already kept versus relevance when reranking"""
+
+
+@dataclass
+class CacheConfig:
+    """
+    Configuration class for the caches in front of external services.
+    """
+
+    enabled: bool = True
+    """Whether caching is enabled at all"""
+
+    directory: str = ".cache/deepsearch"
+    """Directory holding the persistent cache files"""
+
+    page_ttl: float = 24 * 3600
+    """Seconds a fetched page stays fresh"""
+
+    page_max_bytes: int = 256 * 1024 * 1024
+    """Maximum (compressed) bytes of the page cache, least recently used pages are evicted first"""
+
+    serp_ttl: float = 6 * 3600
+    """Seconds a search result list stays fresh"""
+
+    serp_time_sensitive_ttl: float = 15 * 60
+    """Seconds a search result list stays fresh for time-sensitive queries (e.g. "last 30 days")"""
+
+    serp_memory_items: int = 512
+    """Maximum number of queries kept in the in-memory search cache"""
+
+    serp_disk: bool = True
+    """Whether to back the in-memory search cache with a persistent one"""
+
+    serp_max_bytes: int = 64 * 1024 * 1024
+    """Maximum (compressed) bytes of the persistent search cache"""
+
+    embedding_memory_items: int = 4096
+    """Maximum number of vectors kept in the in-memory embedding cache"""
+
+    embedding_max_bytes: int = 256 * 1024 * 1024
+    """Maximum bytes of the persistent embedding cache"""
+
+    response_backend: Literal["memory", "disk"] = "disk"
+    """Where LLM responses are cached"""
+
+    response_memory_items: int = 1024
+    """Maximum number of responses kept by the memory backend"""
+
+    response_max_bytes: int = 128 * 1024 * 1024
+    """Maximum (compressed) bytes of the disk backend"""
+
+    response_ttl: float | None = None
+    """Seconds a cached response stays valid (None means forever)"""
+
+
+@dataclass
+class ReplayConfig:
+    """
+    Configuration class for recording and replaying exchanges with external services.
+    """
+
+    mode: Literal["off", "record", "replay"] = "off"
+    """Record exchanges to the fixture, replay them from it, or talk to the real services"""
+
+    fixture: str = "fixtures/session.jsonl"
+    """Path of the JSONL fixture file"""
+
+    latency: float | None = None
+    """Fixed latency in seconds injected into every replayed response (None uses the recorded latency)"""
+
+    latency_scale: float = 1.0
+    """Factor applied to the recorded latency when no fixed latency is set"""
+
+
+@dataclass
+class RetryConfig:
+    """
+    Configuration class for retries, deadlines and hedged requests to external services.
+    """
+
+    max_attempts: int = 3
+    """Maximum number of attempts of a call failing with a retryable error"""
+
+    base_delay: float = 0.5
+    """Seconds of the first backoff, doubled on every further attempt (with full jitter)"""
+
+    max_delay: float = 8.0
+    """Upper bound in seconds of a single backoff"""
+
+    llm_deadline: float = 120.0
+    """Seconds an LLM call may take over all its attempts"""
+
+    embedding_deadline: float = 60.0
+    """Seconds an embedding batch may take over all its attempts"""
+
+    fetch_deadline: float = 60.0
+    """Seconds a page fetch may take over all its attempts"""
+
+    hedge: bool = True
+    """Whether to send a duplicate page fetch when the first one is slow"""
+
+    hedge_percentile: float = 95.0
+    """Latency percentile of recent fetches after which a duplicate fetch is sent"""
+
+    hedge_min_samples: int = 20
+    """Number of observed fetches required before hedging"""
+
+
+@dataclass
+class MetricsConfig:
+    """
+    Configuration class for exporting metrics at the end of a run.
+    """
+
+    prometheus_file: str | None = "metrics/deepsearch.prom"
+    """File the metrics are written to in Prometheus text format (None disables it)"""
+
+    json_file: str | None = "metrics/deepsearch.json"
+    """File the JSON snapshot of the metrics is written to (None disables it)"""
+
+
+@dataclass
+class ServerConfig:
+    """
+    Configuration class for the HTTP service mode.
+    """
+
+    host: str = "127.0.0.1"
+    """Interface the server listens on"""
+
+    port: int = 8000
+    """Port the server listens on"""
+
+    max_concurrent_sessions: int = 8
+    """Maximum number of research sessions running at the same time, the others wait"""
+
+    keep_sessions: int = 256
+    """Number of finished sessions kept for their results to be fetched"""
+
+
+@dataclass
+class RateLimitConfig:
+    """
+    Configuration class for the quotas of a provider model.
+    """
+
+    rpm: int | None = None
+    """Maximum requests per minute (None means no limit)"""
+
+    tpm: int | None = None
+    """Maximum tokens per minute (None means no limit)"""
+
+
+@dataclass
+class PriceConfig:
+    """
+    Configuration class for the price of a provider model, in USD per million tokens.
+    """
+
+    input: float = 0.0
+    """Price of a million input tokens"""
+
+    output: float = 0.0
+    """Price of a million output tokens"""
+
+    def cost(self, input_tokens: int, output_tokens: int) -> float:
+        return (input_tokens * self.input + output_tokens * self.output) / 1_000_000
+
+
 @dataclass
 class Configuration:
     """
@@ -103,6 +402,45 @@ class Configuration:
     execution_config: ExecutionConfig = field(default_factory=ExecutionConfig)
     """Configuration for execution settings"""
 
+    fetch_config: FetchConfig = field(default_factory=FetchConfig)
+    """Configuration for outgoing HTTP fetches"""
+
+    visit_config: VisitConfig = field(default_factory=VisitConfig)
+    """Configuration for the visit tool"""
+
+    knowledge_config: KnowledgeConfig = field(default_factory=KnowledgeConfig)
+    """Configuration for the knowledge put into prompts"""
+
+    compaction_config: CompactionConfig = field(default_factory=CompactionConfig)
+    """Configuration for compacting the planner's conversation history"""
+
+    tool_output_config: ToolOutputConfig = field(default_factory=ToolOutputConfig)
+    """Configuration for rendering tool results"""
+
+    search_config: SearchConfig = field(default_factory=SearchConfig)
+    """Configuration for web search"""
+
+    cache_config: CacheConfig = field(default_factory=CacheConfig)
+    """Configuration for caches"""
+
+    replay_config: ReplayConfig = field(default_factory=ReplayConfig)
+    """Configuration for recording and replaying external exchanges"""
+
+    retry_config: RetryConfig = field(default_factory=RetryConfig)
+    """Configuration for retries, deadlines and hedged requests"""
+
+    metrics_config: MetricsConfig = field(default_factory=MetricsConfig)
+    """Configuration for exporting metrics"""
+
+    server_config: ServerConfig = field(default_factory=ServerConfig)
+    """Configuration for the HTTP service mode"""
+
+    rate_limits: dict[str, RateLimitConfig] = field(default_factory=dict)
+    """Quotas indexed by provider model name (e.g. 'gpt-4o')"""
+
+    pricing: dict[str, PriceConfig] = field(default_factory=dict)
+    """Prices indexed by provider model name (e.g. 'gpt-4o')"""
+
     model_settings: dict[str, ModelConfig] | None = None
     """Dictionary of model configurations indexed by model name"""
 
@@ -123,6 +461,27 @@ class Configuration:
             for model_name, model_config in yaml_data["models"].items()
         }
         self.execution_config = ExecutionConfig(**yaml_data["execution"])
+        self.fetch_config = FetchConfig(**yaml_data.get("fetch", {}))
+        self.visit_config = VisitConfig(**yaml_data.get("visit", {}))
+        self.knowledge_config = KnowledgeConfig(**yaml_data.get("knowledge", {}))
+        self.compaction_config = CompactionConfig(**yaml_data.get("compaction", {}))
+        self.tool_output_config = ToolOutputConfig(
+            **yaml_data.get("tool_output", {})
+        )
+        self.search_config = SearchConfig(**yaml_data.get("search", {}))
+        self.cache_config = CacheConfig(**yaml_data.get("cache", {}))
+        self.replay_config = ReplayConfig(**yaml_data.get("replay", {}))
+        self.retry_config = RetryConfig(**yaml_data.get("retry", {}))
+        self.metrics_config = MetricsConfig(**yaml_data.get("metrics", {}))
+        self.server_config = ServerConfig(**yaml_data.get("server", {}))
+        self.rate_limits = {
+            model_name: RateLimitConfig(**limit)
+            for model_name, limit in yaml_data.get("rate_limits", {}).items()
+        }
+        self.pricing = {
+            model_name: PriceConfig(**price)
+            for model_name, price in yaml_data.get("pricing", {}).items()
+        }
 
     def get_model_config(self, model_name: str) -> ModelConfig:
         """
@@ -1,19 +1,29 @@
 import asyncio
 from asyncio.log import logger
 import contextvars
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 import time
-from typing import Dict, List, Literal
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Set, Tuple, TypeVar
 import uuid
 
 from agents import Usage
+import numpy as np
 from pydantic import BaseModel
 
+from deepsearch_agents.events import EventStream, EventType
+from deepsearch_agents.metrics import deduplicated
+
+T = TypeVar("T")
+
 
 _current_task_id: contextvars.ContextVar[str | None] = contextvars.ContextVar(
     "current_task_id", default=None
 )
 
+_current_task_context: contextvars.ContextVar["TaskContext | None"] = (
+    contextvars.ContextVar("current_task_context", default=None)
+)
+
 
 class Evaluation(BaseModel):
     reason: str
@@ -58,6 +68,52 @@ _list_out_knowledge_template = """
 """
 
 
+@dataclass
+class LedgerEntry:
+    requests: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost: float = 0.0
+    """Cost in USD"""
+
+
+@dataclass
+class Ledger:
+    """
+    Tokens and cost of the model calls of a task, by model.
+    """
+
+    entries: Dict[str, LedgerEntry] = field(default_factory=dict)
+
+    def record(
+        self, model_name: str, input_tokens: int, output_tokens: int, cost: float
+    ) -> None:
+        entry = self.entries.setdefault(model_name, LedgerEntry())
+        entry.requests += 1
+        entry.input_tokens += input_tokens
+        entry.output_tokens += output_tokens
+        entry.cost += cost
+
+    def merge(self, other: "Ledger") -> None:
+        for model_name, entry in other.entries.items():
+            total = self.entries.setdefault(model_name, LedgerEntry())
+            total.requests += entry.requests
+            total.input_tokens += entry.input_tokens
+            total.output_tokens += entry.output_tokens
+            total.cost += entry.cost
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(e.input_tokens + e.output_tokens for e in self.entries.values())
+
+    @property
+    def cost(self) -> float:
+        return sum(e.cost for e in self.entries.values())
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        return {name: asdict(entry) for name, entry in self.entries.items()}
+
+
 @dataclass
 class Task:
     origin_query: str
@@ -72,6 +128,9 @@ class Task:
     answer: Answer | None = None
     attempt: int = 0
     usage: Usage | None = None
+    ledger: Ledger = field(default_factory=Ledger)
+    visited_urls: Set[str] = field(default_factory=set)
+    """Canonical URLs this task has visited"""
 
     def is_origin_query(self) -> bool:
         return self.origin_query == self.query
@@ -80,14 +139,21 @@ class Task:
         """Set the current task as the current task"""
         return _current_task_id.set(self.id)
 
-    def list_out_knowledge(self, template: str = _list_out_knowledge_template) -> str:
+    def list_out_knowledge(
+        self,
+        template: str = _list_out_knowledge_template,
+        knowledges: List[Knowledge] | None = None,
+    ) -> str:
+        """List out the knowledge of the task, or the given knowledge items"""
         return "\n\n".join(
             [
                 template.format(
                     knowledge=knowledge,
                     i=i + 1,
                 )
-                for i, knowledge in enumerate(self.knowledges)
+                for i, knowledge in enumerate(
+                    self.knowledges if knowledges is None else knowledges
+                )
             ]
         )
 
@@ -105,16 +171,120 @@ class Task:
         self.usage = u
 
 
+class KnowledgeIndex:
+    """
+    In-memory vector index of the knowledge found in a session, every item embedded once.
+    Items whose embedding failed are kept pending until they are embedded.
+    """
+
+    def __init__(self) -> None:
+        self.items: List[Knowledge] = []
+        self.pending: List[Knowledge] = []
+        self._vectors: List[np.ndarray] = []
+        self._matrix: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self.items) + len(self.pending)
+
+    def __contains__(self, knowledge: Knowledge) -> bool:
+        # tasks share Knowledge objects, compare by identity
+        return any(item is knowledge for item in self.items + self.pending)
+
+    def add(self, knowledge: Knowledge, embedding: List[float]) -> None:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        self.pending = [item for item in self.pending if item is not knowledge]
+        self.items.append(knowledge)
+        self._vectors.append(vector / norm if norm else vector)
+        self._matrix = None
+
+    def search(self, embedding: List[float], k: int) -> List[Tuple[Knowledge, float]]:
+        """The k items most similar to an embedding, with their cosine similarity"""
+        if not self.items or k <= 0:
+            return []
+        if self._matrix is None:
+            self._matrix = np.vstack(self._vectors)
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        scores = self._matrix @ (query / norm if norm else query)
+        top = np.argsort(-scores)[:k]
+        return [(self.items[i], float(scores[i])) for i in top]
+
+
+class UrlRegistry:
+    """
+    Pages fetched and summarized during a session, shared by all its tasks.
+
+    Concurrent requests for the same page share a single fetch, and a page is summarized
+    once per query. Failed fetches and summaries are forgotten so that they can be retried.
+    """
+
+    def __init__(self) -> None:
+        self.pages: Dict[str, asyncio.Future] = {}
+        """Fetches by canonical URL"""
+        self.visits: Dict[Tuple[str, str], asyncio.Future] = {}
+        """Knowledge (or None when not useful) by canonical URL and query"""
+
+    async def fetch(self, url: str, fetch: Callable[[], Awaitable[T]]) -> T:
+        """Fetch a page, or join the fetch of the page already running or done"""
+        return await self._single_flight("page", self.pages, url, fetch)
+
+    async def visit(
+        self,
+        url: str,
+        query: str,
+        visit: Callable[[], Awaitable[Knowledge | None]],
+    ) -> Knowledge | None:
+        """Summarize a page for a query, or join the summary already running or done"""
+        return await self._single_flight("visit", self.visits, (url, query), visit)
+
+    async def _single_flight(
+        self,
+        kind: str,
+        flights: Dict[Any, asyncio.Future],
+        key: Any,
+        call: Callable[[], Awaitable[T]],
+    ) -> T:
+        flight = flights.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(call())
+            flights[key] = flight
+
+            def forget_failed(f: asyncio.Future) -> None:
+                if (f.cancelled() or f.exception()) and flights.get(key) is f:
+                    del flights[key]
+
+            flight.add_done_callback(forget_failed)
+        else:
+            deduplicated.inc(kind=kind)
+        # a waiter cancelled does not cancel the others
+        return await asyncio.shield(flight)
+
+
 @dataclass
 class TaskContext:
     start_date_time: str
     tasks: Dict[str, Task] = field(default_factory=dict)
-    # todo: add URLs that are visited, and the results
-    #  also add urls available for visit
+    reserved_tokens: int = 0
+    """Tokens reserved by model calls in flight"""
+    reserved_cost: float = 0.0
+    """Cost in USD reserved by model calls in flight"""
+    events: EventStream | None = None
+    """Where the progress of the session is streamed to, if anyone listens"""
+    urls: UrlRegistry = field(default_factory=UrlRegistry)
+    """Pages fetched and summarized in the session"""
+    knowledge: KnowledgeIndex = field(default_factory=KnowledgeIndex)
+    """Knowledge found by all tasks of the session"""
+    # todo: add urls available for visit
 
     def __init__(self, task: Task):
         self.tasks = {}
         self.tasks[task.id] = task
+        self.reserved_tokens = 0
+        self.reserved_cost = 0.0
+        self.events = None
+        self.urls = UrlRegistry()
+        self.knowledge = KnowledgeIndex()
         self.start_date_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
 
     def current_task_id(self) -> str:
@@ -129,6 +299,11 @@ class TaskContext:
         """Restore the previous task context"""
         _current_task_id.reset(token)
 
+    def emit(self, type: EventType, **data: Any) -> None:
+        """Emit a progress event of the current task"""
+        if self.events is not None:
+            self.events.emit(type, self.current_task_id(), **data)
+
     def final_answer(self) -> Answer | None:
         root_task = next((task for task in self.tasks.values() if task.parent is None))
         return root_task.answer
@@ -138,10 +313,23 @@ class TaskContext:
         [total.add(task.usage) for task in self.tasks.values() if task.usage]
         return total
 
+    def ledger(self) -> Ledger:
+        """The ledger of all tasks"""
+        total = Ledger()
+        for task in self.tasks.values():
+            total.merge(task.ledger)
+        return total
+
+
+def current_task_context() -> TaskContext | None:
+    """Get the task context of the running session, None outside of a session"""
+    return _current_task_context.get()
+
 
 def build_task_context(query: str) -> TaskContext:
     """Create a new task context and set it in the current coroutine context"""
     task = Task(origin_query=query, query=query)
     task_context = TaskContext(task)
     task.set_as_current()
+    _current_task_context.set(task_context)
     return task_context
@@ -0,0 +1,132 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, Literal
+
+from pydantic import BaseModel, Field
+
+EventType = Literal[
+    "task_created",
+    "tool_start",
+    "tool_end",
+    "knowledge_added",
+    "task_solved",
+    "answer_delta",
+    "answer_accepted",
+    "answer_rejected",
+    "session_finished",
+]
+
+
+class SessionEvent(BaseModel):
+    """
+    Progress of a research session, emitted as it happens.
+    """
+
+    type: EventType
+    task_id: str | None = None
+    data: Dict[str, Any] = Field(default_factory=dict)
+    time: float = Field(default_factory=time.time)
+
+
+class EventStream:
+    """
+    Queue of the events of one session, consumed with `async for` until the session closes it.
+    """
+
+    def __init__(self) -> None:
+        self._queue: asyncio.Queue[SessionEvent | None] = asyncio.Queue()
+        self.closed = False
+
+    def emit(self, type: EventType, task_id: str | None = None, **data: Any) -> None:
+        if not self.closed:
+            self._queue.put_nowait(SessionEvent(type=type, task_id=task_id, data=data))
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self._queue.put_nowait(None)
+
+    async def __aiter__(self) -> AsyncIterator[SessionEvent]:
+        while (event := await self._queue.get()) is not None:
+            yield event
+
+
+class AnswerFieldExtractor:
+    """
+    Extracts the value of the "answer" string field from the arguments of an `answer`
+    tool call while they stream in as JSON fragments.
+    """
+
+    _escapes = {
+        '"': '"',
+        "\\": "\\",
+        "/": "/",
+        "b": "\b",
+        "f": "\f",
+        "n": "\n",
+        "r": "\r",
+        "t": "\t",
+    }
+
+    def __init__(self, field: str = "answer") -> None:
+        self._key = f'"{field}"'
+        self._buffer = ""
+        self._in_value = False
+        self._done = False
+
+    def feed(self, fragment: str) -> str:
+        """
+        Add a fragment of the arguments and return the newly decoded characters of the field.
+        """
+        if self._done:
+            return ""
+        self._buffer += fragment
+        if not self._in_value:
+            start = self._value_start()
+            if start is None:
+                return ""
+            self._buffer = self._buffer[start:]
+            self._in_value = True
+
+        out = []
+        i = 0
+        while i < len(self._buffer):
+            c = self._buffer[i]
+            if c == '"':
+                self._done = True
+                break
+            if c != "\\":
+                out.append(c)
+                i += 1
+                continue
+            # keep an incomplete escape sequence for the next fragment
+            if i + 1 >= len(self._buffer):
+                break
+            e = self._buffer[i + 1]
+            if e == "u":
+                if i + 6 > len(self._buffer):
+                    break
+                out.append(chr(int(self._buffer[i + 2 : i + 6], 16)))
+                i += 6
+            else:
+                out.append(self._escapes.get(e, e))
+                i += 2
+        self._buffer = self._buffer[i:]
+        return "".join(out)
+
+    def _value_start(self) -> int | None:
+        key = self._buffer.find(self._key)
+        while key >= 0:
+            stripped = self._buffer[key + len(self._key) :].lstrip()
+            if not stripped:
+                # wait for the next fragment to tell a key from a value
+                return None
+            if stripped.startswith(":"):
+                value = stripped[1:].lstrip()
+                if not value:
+                    return None
+                if value.startswith('"'):
+                    return len(self._buffer) - len(value) + 1
+            # a value that happens to read "answer", or a non-string field
+            key = self._buffer.find(self._key, key + 1)
+        return None
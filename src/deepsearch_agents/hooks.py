@@ -0,0 +1,91 @@
+from collections import defaultdict
+import time
+from typing import Any, Dict, List, Tuple
+
+from agents import Agent, AgentHooks, RunContextWrapper, Tool
+
+from deepsearch_agents import conf
+from deepsearch_agents.context import TaskContext
+from deepsearch_agents.log import logger
+from deepsearch_agents.metrics import tool_duration
+
+
+class Hooks(AgentHooks[TaskContext]):
+    def __init__(self) -> None:
+        # start times of the running tool calls of each task, by tool and call id
+        self._tool_started: Dict[Tuple[str, str, Any], List[float]] = defaultdict(
+            list
+        )
+        # tools called in the current turn of each task, and how many are still running;
+        # a turn may call several tools at once (parallel_tool_calls)
+        self._turn_tools: Dict[str, List[str]] = defaultdict(list)
+        self._running: Dict[str, int] = defaultdict(int)
+
+    @staticmethod
+    def _call_key(
+        ctx: RunContextWrapper[TaskContext], tool: Tool
+    ) -> Tuple[str, str, Any]:
+        # the SDK passes a context per tool call with its id, older versions share one
+        return (
+            ctx.context.current_task_id(),
+            tool.name,
+            getattr(ctx, "tool_call_id", None),
+        )
+
+    async def on_start(
+        self,
+        ctx: RunContextWrapper[TaskContext],
+        agent: Agent[TaskContext],
+    ) -> None:
+        ctx.context.current_task().set_usage(ctx.usage)
+        agent.rebuild_tools(ctx)
+
+    async def on_tool_start(
+        self,
+        ctx: RunContextWrapper[TaskContext],
+        _: Agent[TaskContext],
+        tool: Tool,
+    ) -> None:
+        task = ctx.context.current_task()
+        if not self._running[task.id]:
+            # the first tool call of a turn
+            task.turn += 1
+            self._turn_tools[task.id] = []
+        self._running[task.id] += 1
+        self._turn_tools[task.id].append(tool.name)
+        self._tool_started[self._call_key(ctx, tool)].append(time.perf_counter())
+        ctx.context.emit("tool_start", tool=tool.name)
+
+    async def on_tool_end(
+        self,
+        ctx: RunContextWrapper[TaskContext],
+        agent: Agent[TaskContext],
+        tool: Tool,
+        result: str,
+    ) -> None:
+        key = self._call_key(ctx, tool)
+        started = self._tool_started[key].pop(0) if self._tool_started[key] else None
+        if not self._tool_started[key]:
+            del self._tool_started[key]
+        duration = time.perf_counter() - started if started is not None else None
+        if duration is not None:
+            tool_duration.observe(duration, tool=tool.name)
+        ctx.context.emit("tool_end", tool=tool.name, duration=duration, result=result)
+        maximun = conf.get_configuration().execution_config.max_token_usage
+        curr = ctx.context.current_task().usage
+
+        total = ctx.context.usage()
+        logger.info(
+            f"finish action {tool.name} result: {result} curr token usage: {curr.total_tokens} ({(curr.total_tokens/maximun):.2%}),"
+            f"total usage: {total.total_tokens} ({(total.total_tokens/maximun):.2%})."
+        )
+        task_id = ctx.context.current_task_id()
+        self._running[task_id] -= 1
+        if self._running[task_id] > 0:
+            # the other tools of the turn are still running, the tools change once they are done
+            return
+        del self._running[task_id]
+        tools = self._turn_tools.pop(task_id, [])
+        # a turn of a single action can't be repeated right away, a turn of several can
+        last_used = tools[0] if len(set(tools)) == 1 else None
+        agent.rebuild_tools(ctx, last_used)
@@ -0,0 +1,170 @@
+from deepsearch_agents.conf import ModelConfig, get_configuration
+from deepsearch_agents.context import TaskContext, current_task_context
+from deepsearch_agents.log import logger
+from deepsearch_agents.metrics import errors
+
+MIN_TRIMMED_INPUT_TOKENS = 256
+"""Below this many tokens of trimmed input a call is refused rather than trimmed"""
+
+
+class BudgetExceeded(Exception):
+    """
+    Raised before dispatching a model call that would exceed the session's token or cost budget.
+    """
+
+
+def price(model_name: str, input_tokens: int, output_tokens: int) -> float:
+    """
+    Cost in USD of a call, 0 for models without a configured price.
+    """
+    model_price = get_configuration().pricing.get(model_name)
+    return model_price.cost(input_tokens, output_tokens) if model_price else 0.0
+
+
+def spent_tokens(context: TaskContext) -> int:
+    """
+    Tokens spent or reserved against `max_token_usage`, without models that only count in cost.
+    """
+    unbudgeted = {
+        model_conf.model_name
+        for model_conf in (get_configuration().model_settings or {}).values()
+        if not model_conf.token_budget
+    }
+    spent = sum(
+        entry.input_tokens + entry.output_tokens
+        for model_name, entry in context.ledger().entries.items()
+        if model_name not in unbudgeted
+    )
+    return spent + context.reserved_tokens
+
+
+def spent_cost(context: TaskContext) -> float:
+    return context.ledger().cost + context.reserved_cost
+
+
+def running_low(context: TaskContext, ratio: float = 0.85) -> bool:
+    """
+    Whether the session has spent, or reserved, more than `ratio` of its token or cost budget.
+    """
+    execution_conf = get_configuration().execution_config
+    if spent_tokens(context) > execution_conf.max_token_usage * ratio:
+        return True
+    max_cost = execution_conf.max_cost
+    return max_cost is not None and spent_cost(context) > max_cost * ratio
+
+
+def input_allowance(model_conf: ModelConfig, output_tokens: int) -> int | None:
+    """
+    How many input tokens a call reserving `output_tokens` may still send, None outside of
+    a session or when nothing limits the model.
+    """
+    context = current_task_context()
+    if context is None:
+        return None
+    execution_conf = get_configuration().execution_config
+    allowed = None
+    if model_conf.token_budget:
+        allowed = execution_conf.max_token_usage - spent_tokens(context) - output_tokens
+    if execution_conf.max_cost is not None:
+        model_price = get_configuration().pricing.get(model_conf.model_name)
+        if model_price and model_price.input > 0:
+            remaining = (
+                execution_conf.max_cost
+                - spent_cost(context)
+                - model_price.cost(0, output_tokens)
+            )
+            by_cost = int(remaining * 1_000_000 / model_price.input)
+            allowed = by_cost if allowed is None else min(allowed, by_cost)
+    return None if allowed is None else max(allowed, 0)
+
+
+class Reservation:
+    """
+    Tokens and cost held for a call in flight. `settle` records the actual usage in the
+    ledger of the current task and frees the reservation, `cancel` only frees it.
+    """
+
+    def __init__(
+        self,
+        context: TaskContext | None,
+        model_conf: ModelConfig,
+        input_tokens: int,
+        output_tokens: int,
+    ):
+        self.context = context
+        self.model_name = model_conf.model_name
+        # tokens of models outside the token budget are only held as cost
+        self.tokens = input_tokens + output_tokens if model_conf.token_budget else 0
+        self.cost = price(self.model_name, input_tokens, output_tokens)
+        if context is not None:
+            context.reserved_tokens += self.tokens
+            context.reserved_cost += self.cost
+
+    def _release(self) -> None:
+        if self.context is not None:
+            self.context.reserved_tokens -= self.tokens
+            self.context.reserved_cost -= self.cost
+            self.context = None
+
+    def settle(self, input_tokens: int, output_tokens: int) -> None:
+        context = self.context
+        self._release()
+        if context is not None:
+            context.current_task().ledger.record(
+                self.model_name,
+                input_tokens,
+                output_tokens,
+                price(self.model_name, input_tokens, output_tokens),
+            )
+
+    def cancel(self) -> None:
+        self._release()
+
+
+def reserve(
+    model_conf: ModelConfig, input_tokens: int, output_tokens: int | None = None
+) -> Reservation:
+    """
+    Reserve the estimated tokens of a call before dispatching it.
+    The output is reserved at the model's `max_tokens` unless given.
+
+    Raises:
+        BudgetExceeded: when the call doesn't fit into what is left of the budget.
+    """
+    output_tokens = model_conf.max_tokens if output_tokens is None else output_tokens
+    allowed = input_allowance(model_conf, output_tokens)
+    if allowed is not None and input_tokens > allowed:
+        errors.inc(stage="budget", error="BudgetExceeded")
+        raise BudgetExceeded(
+            f"Call to {model_conf.model_name} needs ~{input_tokens} input tokens "
+            f"(+{output_tokens} output), only {allowed} are left in the budget"
+        )
+    return Reservation(current_task_context(), model_conf, input_tokens, output_tokens)
+
+
+def trim_allowance(model_conf: ModelConfig, fixed_tokens: int) -> int | None:
+    """
+    How many tokens of trimmable input fit next to `fixed_tokens` of instructions,
+    within the model's `max_input_tokens` and what is left of the budget. None means no limit.
+
+    Raises:
+        BudgetExceeded: when less than MIN_TRIMMED_INPUT_TOKENS would fit.
+    """
+    limits = [
+        limit
+        for limit in [
+            model_conf.max_input_tokens,
+            input_allowance(model_conf, model_conf.max_tokens),
+        ]
+        if limit is not None
+    ]
+    if not limits:
+        return None
+    allowed = min(limits) - fixed_tokens
+    if allowed < MIN_TRIMMED_INPUT_TOKENS:
+        errors.inc(stage="budget", error="BudgetExceeded")
+        raise BudgetExceeded(
+            f"Only {allowed} input tokens left for {model_conf.model_name}, not worth a call"
+        )
+    logger.debug(f"Input to {model_conf.model_name} limited to {allowed} tokens")
+    return allowed
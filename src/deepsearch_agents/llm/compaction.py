@@ -0,0 +1,148 @@
+from typing import Any, AsyncIterator, List, Tuple
+
+from agents import Model, ModelResponse
+
+from deepsearch_agents.conf import CompactionConfig, get_configuration
+from deepsearch_agents.llm.scheduler import estimate_input_tokens
+from deepsearch_agents.llm.tokens import count_tokens, truncate_to_tokens
+from deepsearch_agents.log import logger
+from deepsearch_agents.metrics import planner_input_tokens
+
+
+def _is_tool_output(item: Any) -> bool:
+    return isinstance(item, dict) and item.get("type") == "function_call_output"
+
+
+def _tool_output_turns(items: List[Any]) -> List[List[int]]:
+    """
+    Indexes of the tool outputs of the history, grouped by the turn that called the tools.
+    """
+    turns: List[List[int]] = []
+    previous = False
+    for i, item in enumerate(items):
+        if _is_tool_output(item):
+            if not previous:
+                turns.append([])
+            turns[-1].append(i)
+        # the outputs of one turn follow each other, the next turn starts with a model item
+        previous = _is_tool_output(item)
+    return turns
+
+
+def digest(output: str, max_tokens: int) -> str:
+    """
+    Shorten a tool output to its first `max_tokens` tokens, noting how much was left out.
+    """
+    tokens = count_tokens(output)
+    if tokens <= max_tokens:
+        return output
+    head = truncate_to_tokens(output, max_tokens).rstrip()
+    return f"{head}\n[... {tokens - max_tokens} more tokens of this older result were compacted]"
+
+
+def compact_history(
+    system_instructions: str | None,
+    input: str | List[Any],
+    compaction_conf: CompactionConfig,
+) -> Tuple[str | List[Any], int, int]:
+    """
+    Replace the tool outputs of older turns with their digest, keeping the latest
+    `keep_recent_turns` turns verbatim unless the input exceeds `max_input_tokens`.
+    Tool calls are kept, so that every output still answers its call.
+
+    Returns:
+        The compacted input, and the estimated input tokens before and after.
+    """
+    before = estimate_input_tokens(system_instructions, input)
+    if isinstance(input, str):
+        return input, before, before
+    turns = _tool_output_turns(input)
+    keep = max(compaction_conf.keep_recent_turns, 0)
+    older = turns[: max(len(turns) - keep, 0)]
+    recent = turns[len(older) :]
+
+    items = list(input)
+
+    def compact(indexes: List[int]) -> None:
+        for i in indexes:
+            output = items[i].get("output")
+            if isinstance(output, str):
+                # copy, the SDK keeps the original items for the next turn
+                items[i] = {
+                    **items[i],
+                    "output": digest(output, compaction_conf.digest_tokens),
+                }
+
+    for turn in older:
+        compact(turn)
+    after = estimate_input_tokens(system_instructions, items)
+    # over the ceiling, digest the recent turns too, oldest first
+    for turn in recent:
+        if (
+            compaction_conf.max_input_tokens is None
+            or after <= compaction_conf.max_input_tokens
+        ):
+            break
+        compact(turn)
+        after = estimate_input_tokens(system_instructions, items)
+    return items, before, after
+
+
+class CompactingModel(Model):
+    """
+    Wraps an agents SDK model so that the history re-sent on every turn is compacted first.
+    """
+
+    def __init__(self, model: Model):
+        self.model = model
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.model, name)
+
+    def _compact(self, args: tuple, kwargs: dict) -> Tuple[tuple, dict]:
+        compaction_conf = get_configuration().compaction_config
+        system_instructions = kwargs.get(
+            "system_instructions", args[0] if args else None
+        )
+        if "input" in kwargs:
+            input = kwargs["input"]
+        elif len(args) > 1:
+            input = args[1]
+        else:
+            return args, kwargs
+
+        input, before, after = compact_history(
+            system_instructions, input, compaction_conf
+        )
+        planner_input_tokens.observe(before, stage="before")
+        planner_input_tokens.observe(after, stage="after")
+        if after < before:
+            logger.info(f"Compacted planner history: {before} -> {after} input tokens")
+        if "input" in kwargs:
+            return args, {**kwargs, "input": input}
+        return (args[0], input, *args[2:]), kwargs
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        args, kwargs = self._compact(args, kwargs)
+        return await self.model.get_response(*args, **kwargs)
+
+    async def stream_response(  # type: ignore[override]
+        self, *args: Any, **kwargs: Any
+    ) -> AsyncIterator[Any]:
+        args, kwargs = self._compact(args, kwargs)
+        async for event in self.model.stream_response(*args, **kwargs):
+            yield event
+
+
+def compacting_model(model: str | Model | None) -> str | Model | None:
+    """
+    Wrap a planner model with history compaction, when it is enabled. Model names are
+    returned as they are, the SDK resolves them to models of its own.
+    """
+    if (
+        not isinstance(model, Model)
+        or isinstance(model, CompactingModel)
+        or not get_configuration().compaction_config.enabled
+    ):
+        return model
+    return CompactingModel(model)
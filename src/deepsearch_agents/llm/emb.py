@@ -1,19 +1,36 @@
+import asyncio
+import hashlib
+import os
+import time
 from typing import List
 
 from agents import Usage
+import numpy as np
 from openai import AsyncOpenAI
 from pydantic import BaseModel
 
-from deepsearch_agents.conf import get_configuration
-
-client = AsyncOpenAI()
-
+from deepsearch_agents.cache import (
+    Cache,
+    DiskCache,
+    MemoryCache,
+    TieredCache,
+    register_cache,
+)
+from deepsearch_agents.llm.budget import reserve
+from deepsearch_agents.llm.scheduler import schedule
+from deepsearch_agents.metrics import errors, observe_model_request
+from deepsearch_agents.replay import openai_http_client
+from deepsearch_agents.resilience import retry
+from deepsearch_agents.conf import ModelConfig, get_configuration
 
 config = get_configuration()
 
 client = AsyncOpenAI(
     base_url=config.openai_base_url if config else None,
     api_key=config.openai_api_key,
+    http_client=openai_http_client(),
+    # retries go through deepsearch_agents.resilience
+    max_retries=0,
 )
 
 
@@ -22,16 +39,152 @@ class EmbeddingResponse(BaseModel):
     usage: Usage
 
 
+class EmbeddingsResponse(BaseModel):
+    embeddings: List[List[float]]
+    usage: Usage
+
+
+MAX_BATCH_INPUTS = 2048
+"""Maximum number of inputs the embeddings API accepts per request"""
+
+MAX_BATCH_TOKENS = 300_000
+"""Maximum number of tokens, summed over all inputs, the embeddings API accepts per request"""
+
+
+_embedding_cache: Cache | None = None
+
+
+def get_embedding_cache() -> Cache | None:
+    """
+    Get the embedding cache: an in-memory LRU backed by a persistent cache.
+    Vectors are stored as raw float32 bytes. Returns None when caching is disabled.
+    """
+    global _embedding_cache
+    cache_conf = config.cache_config
+    if not cache_conf.enabled:
+        return None
+    if _embedding_cache is None:
+        _embedding_cache = register_cache(
+            "embedding",
+            TieredCache(
+                MemoryCache(max_items=cache_conf.embedding_memory_items),
+                DiskCache(
+                    os.path.join(cache_conf.directory, "embeddings.sqlite"),
+                    max_bytes=cache_conf.embedding_max_bytes,
+                    # float32 vectors barely compress
+                    compress=False,
+                ),
+            ),
+        )
+    return _embedding_cache
+
+
+def _cache_key(model_name: str, text: str) -> str:
+    return f"{model_name}:{hashlib.sha256(text.encode()).hexdigest()}"
+
+
 async def get_embedding(model: str, text: str) -> EmbeddingResponse:
+    response = await get_embeddings(model, [text])
+    return EmbeddingResponse(embedding=response.embeddings[0], usage=response.usage)
+
+
+async def get_embeddings(model: str, texts: List[str]) -> EmbeddingsResponse:
+    """
+    Embed many texts with as few requests as possible.
+
+    Cached and duplicate texts are not sent, the rest are split into batches that respect
+    the provider's input-count and token limits. The embeddings are returned in the order of `texts`.
+    """
     model_conf = config.get_model_config(model)
-    response = await client.embeddings.create(
-        model=model_conf.model_name,
-        input=text,
+    cache = get_embedding_cache()
+    embeddings: List[List[float] | None] = [None] * len(texts)
+    to_embed: dict[str, List[int]] = {}
+    for i, text in enumerate(texts):
+        cached = (
+            cache.get(_cache_key(model_conf.model_name, text)) if cache else None
+        )
+        if cached is not None:
+            embeddings[i] = np.frombuffer(cached, dtype=np.float32).tolist()
+        else:
+            to_embed.setdefault(text, []).append(i)
+
+    usage = Usage()
+    unique_texts = list(to_embed)
+    responses = await asyncio.gather(
+        *[_embed_batch(model_conf, batch) for batch in _batches(unique_texts)]
+    )
+    results = [data.embedding for r in responses for data in r.data]
+    for r in responses:
+        usage.add(
+            Usage(
+                requests=1,
+                input_tokens=r.usage.prompt_tokens,
+                total_tokens=r.usage.total_tokens,
+            )
+        )
+    for text, embedding in zip(unique_texts, results):
+        if cache is not None:
+            cache.set(
+                _cache_key(model_conf.model_name, text),
+                np.asarray(embedding, dtype=np.float32).tobytes(),
+            )
+        for i in to_embed[text]:
+            embeddings[i] = embedding
+    return EmbeddingsResponse(embeddings=embeddings, usage=usage)  # type: ignore
+
+
+async def _embed_batch(model_conf: ModelConfig, batch: List[str]):
+    return await retry(
+        lambda: _embed_batch_once(model_conf, batch),
+        name=f"Embedding batch of {len(batch)} texts",
+        deadline=config.retry_config.embedding_deadline,
     )
-    return EmbeddingResponse(
-        embedding=response.data[0].embedding,
-        usage=Usage(
-            input_tokens=response.usage.prompt_tokens,
-            total_tokens=response.usage.total_tokens,
-        ),
+
+
+async def _embed_batch_once(model_conf: ModelConfig, batch: List[str]):
+    estimated_tokens = sum(_estimate_tokens(t) for t in batch)
+    reservation = reserve(model_conf, estimated_tokens, output_tokens=0)
+    try:
+        ticket = await schedule(model_conf, estimated_tokens)
+        start = time.perf_counter()
+        response = await client.embeddings.create(
+            model=model_conf.model_name, input=batch
+        )
+    except BaseException as e:
+        reservation.cancel()
+        if isinstance(e, Exception):
+            errors.inc(stage="embedding", error=type(e).__name__)
+        raise
+    ticket.settle(response.usage.total_tokens)
+    reservation.settle(response.usage.prompt_tokens, 0)
+    observe_model_request(
+        model_conf.model_name,
+        "embedding",
+        time.perf_counter() - start,
+        response.usage.prompt_tokens,
+        0,
     )
+    return response
+
+
+def _batches(texts: List[str]) -> List[List[str]]:
+    batches: List[List[str]] = []
+    batch: List[str] = []
+    batch_tokens = 0
+    for text in texts:
+        tokens = _estimate_tokens(text)
+        if batch and (
+            len(batch) >= MAX_BATCH_INPUTS or batch_tokens + tokens > MAX_BATCH_TOKENS
+        ):
+            batches.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append(text)
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _estimate_tokens(text: str) -> int:
+    # conservative: English text averages ~4 characters per token, assume 3
+    return len(text) // 3 + 1
@@ -1,11 +1,22 @@
 import asyncio
+import hashlib
+import json
+import os
+import time
 from typing import Type, TypeVar, Union, cast, overload, Generic
 from agents import TResponseInputItem, Usage
 from openai import AsyncOpenAI
 from openai.types.chat.completion_create_params import ResponseFormatJSONObject
 from pydantic import BaseModel, Field, ValidationError
 
+from deepsearch_agents.cache import Cache, DiskCache, MemoryCache, register_cache
 from deepsearch_agents.log import logger
+from deepsearch_agents.metrics import errors, observe_model_request
+from deepsearch_agents.llm.budget import reserve, trim_allowance
+from deepsearch_agents.llm.tokens import count_tokens, truncate_to_tokens
+from deepsearch_agents.llm.scheduler import estimate_input_tokens, schedule
+from deepsearch_agents.replay import openai_http_client
+from deepsearch_agents.resilience import retry
 from deepsearch_agents.conf import ModelConfig, get_configuration
 from openai.types.chat.parsed_chat_completion import ParsedChatCompletion
 from openai.types.chat.chat_completion import ChatCompletion
@@ -19,12 +30,53 @@ config = get_configuration()
 client = AsyncOpenAI(
     base_url=config.openai_base_url if config else None,
     api_key=config.openai_api_key,
+    http_client=openai_http_client(),
+    # retries go through deepsearch_agents.resilience
+    max_retries=0,
 )
 
 
 class LLMResponse(BaseModel, Generic[T]):
     response: T
     usage: Usage
+    cached_usage: Usage | None = None
+    """Usage of the original call when the response is served from the cache, `usage` is then empty."""
+
+
+_response_cache: Cache | None = None
+
+
+def get_response_cache() -> Cache | None:
+    """
+    Get the LLM response cache, backed by memory or disk depending on the configuration.
+    Returns None when caching is disabled.
+    """
+    global _response_cache
+    cache_conf = config.cache_config
+    if not cache_conf.enabled:
+        return None
+    if _response_cache is None:
+        if cache_conf.response_backend == "memory":
+            backend: Cache = MemoryCache(
+                max_items=cache_conf.response_memory_items,
+                ttl=cache_conf.response_ttl,
+            )
+        else:
+            backend = DiskCache(
+                os.path.join(cache_conf.directory, "responses.sqlite"),
+                max_bytes=cache_conf.response_max_bytes,
+                ttl=cache_conf.response_ttl,
+            )
+        _response_cache = register_cache("response", backend)
+    return _response_cache
+
+
+def set_response_cache(cache: Cache | None) -> None:
+    """
+    Plug in another cache backend for LLM responses.
+    """
+    global _response_cache
+    _response_cache = register_cache("response", cache) if cache else None
 
 
 @overload
@@ -33,6 +85,8 @@ async def get_response(
     input: str | list[TResponseInputItem],
     output_type: None = None,
     system_instructions: str | None = None,
+    cache: bool | None = None,
+    trim: bool = False,
 ) -> LLMResponse[str]: ...
 
 
@@ -42,6 +96,8 @@ async def get_response(
     input: str | list[TResponseInputItem],
     output_type: Type[T],
     system_instructions: str | None = None,
+    cache: bool | None = None,
+    trim: bool = False,
 ) -> LLMResponse[T]: ...
 
 
@@ -50,7 +106,31 @@ async def get_response(
     input: str | list[TResponseInputItem],
     output_type: Type[T] | None = None,
     system_instructions: str | None = None,
+    cache: bool | None = None,
+    trim: bool = False,
 ) -> LLMResponse[T]:
+    """
+    Get a response from the model, parsed into `output_type` if given.
+
+    The call is estimated with the local tokenizer and checked against the session's
+    token and cost budget before it is dispatched.
+
+    Args:
+        cache: Whether to use the response cache. None follows the model's configuration,
+            True forces caching even for non-deterministic sampling.
+        trim: Cut a string `input` down to the model's `max_input_tokens` and to what is left
+            of the budget, instead of refusing the call.
+
+    Raises:
+        BudgetExceeded: when the call doesn't fit into what is left of the budget.
+    """
+    model_conf = config.get_model_config(model)
+    if trim and isinstance(input, str):
+        allowed = trim_allowance(
+            model_conf, count_tokens(system_instructions or "", model_conf.model_name)
+        )
+        if allowed is not None:
+            input = truncate_to_tokens(input, allowed, model_conf.model_name)
     messages = []
     if system_instructions:
         messages.append({"role": "system", "content": system_instructions})
@@ -58,14 +138,118 @@ async def get_response(
         messages.append({"role": "user", "content": input})
     else:
         messages.extend(input)
-    model_conf = config.get_model_config(model)
 
-    if output_type is None:
-        return await _completion(model_conf, messages)  # type: ignore
-    elif _support_response_format(model_conf.model_name):
-        return await _openai_chat_completion_parse(model_conf, messages, output_type)
-    else:
-        return await _completion_and_parse(model_conf, messages, output_type)
+    use_cache = model_conf.is_response_cacheable() if cache is None else cache
+    response_cache = get_response_cache() if use_cache else None
+    if response_cache is None:
+        return await _dispatch(model_conf, messages, output_type)
+
+    key = _response_cache_key(model_conf, messages, output_type)
+    cached = response_cache.get(key)
+    if cached is not None:
+        return _load_response(cached, output_type)
+    ret = await _dispatch(model_conf, messages, output_type)
+    response_cache.set(key, _dump_response(ret))
+    return ret
+
+
+async def _dispatch(
+    model_conf: ModelConfig,
+    messages: list[dict[str, str]],
+    output_type: Type[T] | None,
+) -> LLMResponse[T]:
+    return await retry(
+        lambda: _attempt(model_conf, messages, output_type),
+        name=f"LLM call to {model_conf.model_name}",
+        deadline=config.retry_config.llm_deadline,
+    )
+
+
+async def _attempt(
+    model_conf: ModelConfig,
+    messages: list[dict[str, str]],
+    output_type: Type[T] | None,
+) -> LLMResponse[T]:
+    estimated_tokens = estimate_input_tokens(None, messages)
+    reservation = reserve(model_conf, estimated_tokens)
+    try:
+        ticket = await schedule(model_conf, estimated_tokens)
+        start = time.perf_counter()
+        if output_type is None:
+            ret = await _completion(model_conf, messages)
+        elif _support_response_format(model_conf.model_name):
+            ret = await _openai_chat_completion_parse(model_conf, messages, output_type)
+        else:
+            ret = await _completion_and_parse(model_conf, messages, output_type)
+    except BaseException as e:
+        reservation.cancel()
+        if isinstance(e, Exception):
+            errors.inc(stage="llm", error=type(e).__name__)
+        raise
+    ticket.settle(ret.usage.total_tokens)
+    reservation.settle(ret.usage.input_tokens, ret.usage.output_tokens)
+    observe_model_request(
+        model_conf.model_name,
+        "completion",
+        time.perf_counter() - start,
+        ret.usage.input_tokens,
+        ret.usage.output_tokens,
+    )
+    return ret  # type: ignore
+
+
+def _response_cache_key(
+    model_conf: ModelConfig,
+    messages: list[dict[str, str]],
+    output_type: Type[T] | None,
+) -> str:
+    schema = (
+        output_type.model_json_schema()
+        if output_type is not None and issubclass(output_type, BaseModel)
+        else None
+    )
+    payload = json.dumps(
+        {
+            "model": model_conf.model_name,
+            "temperature": model_conf.temperature,
+            "top_p": model_conf.top_p,
+            "max_tokens": model_conf.max_tokens,
+            "messages": messages,
+            "schema": schema,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _dump_response(ret: LLMResponse) -> bytes:
+    response = ret.response
+    return json.dumps(
+        {
+            "response": (
+                response.model_dump(mode="json")
+                if isinstance(response, BaseModel)
+                else response
+            ),
+            "usage": {
+                "requests": ret.usage.requests,
+                "input_tokens": ret.usage.input_tokens,
+                "output_tokens": ret.usage.output_tokens,
+                "total_tokens": ret.usage.total_tokens,
+            },
+        }
+    ).encode()
+
+
+def _load_response(data: bytes, output_type: Type[T] | None) -> LLMResponse[T]:
+    payload = json.loads(data)
+    response = payload["response"]
+    if output_type is not None and issubclass(output_type, BaseModel):
+        response = output_type.model_validate(response)
+    return LLMResponse(
+        response=response, usage=Usage(), cached_usage=Usage(**payload["usage"])
+    )
 
 
 async def _completion(
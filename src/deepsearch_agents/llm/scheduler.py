@@ -0,0 +1,323 @@
+import asyncio
+from dataclasses import asdict, dataclass
+import heapq
+import itertools
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, List
+
+from agents import Model, ModelResponse
+
+from deepsearch_agents.conf import ModelConfig, get_configuration
+from deepsearch_agents.llm.budget import reserve
+from deepsearch_agents.llm.tokens import count_tokens
+from deepsearch_agents.log import logger
+from deepsearch_agents.metrics import (
+    Sample,
+    counter_sample,
+    errors,
+    gauge_sample,
+    observe_model_request,
+    registry,
+)
+
+
+class TokenBucket:
+    """
+    Classic token bucket: holds up to `capacity` units and refills `capacity` units per minute.
+    """
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(
+            self.capacity, self.level + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until `amount` units are available."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        return max(amount - self.level, 0.0) / self.rate
+
+    def consume(self, amount: float) -> None:
+        """Take units out, the level may go negative when the actual usage exceeded the estimate."""
+        self._refill()
+        self.level -= amount
+
+
+@dataclass
+class SchedulerStats:
+    """
+    Queue metrics of a model scheduler.
+    """
+
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    admitted: int = 0
+    waited: int = 0
+    """Number of admitted requests that had to wait for capacity"""
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return asdict(self)
+
+
+class Ticket:
+    """
+    Admission of one request. Report the actual token usage with `settle` once known,
+    so the token bucket is charged for what the request really cost.
+    """
+
+    def __init__(self, scheduler: "ModelScheduler", estimated_tokens: int):
+        self.scheduler = scheduler
+        self.estimated_tokens = estimated_tokens
+
+    def settle(self, actual_tokens: int) -> None:
+        if self.scheduler.tokens is not None:
+            self.scheduler.tokens.consume(actual_tokens - self.estimated_tokens)
+
+
+class ModelScheduler:
+    """
+    Admits requests to one model within its requests/min and tokens/min quotas.
+    Waiting requests are admitted by priority (lower value first), then in arrival order.
+    """
+
+    def __init__(self, model_name: str, rpm: int | None, tpm: int | None):
+        self.model_name = model_name
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.stats = SchedulerStats()
+        self._queue: List[list] = []
+        self._counter = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    async def acquire(self, estimated_tokens: int, priority: int = 1) -> Ticket:
+        start = time.monotonic()
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._queue, [priority, next(self._counter), future, estimated_tokens]
+        )
+        self.stats.queue_depth = len(self._queue)
+        self.stats.max_queue_depth = max(
+            self.stats.max_queue_depth, self.stats.queue_depth
+        )
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            self._queue = [entry for entry in self._queue if entry[2] is not future]
+            heapq.heapify(self._queue)
+            self.stats.queue_depth = len(self._queue)
+            self._dispatch()
+            raise
+
+        waited = time.monotonic() - start
+        self.stats.admitted += 1
+        if waited > 0.001:
+            self.stats.waited += 1
+            self.stats.total_wait_seconds += waited
+            self.stats.max_wait_seconds = max(self.stats.max_wait_seconds, waited)
+        return Ticket(self, estimated_tokens)
+
+    def _dispatch(self) -> None:
+        """Admit waiting requests while the buckets allow, and retry when capacity refills."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._queue:
+            _, _, future, tokens = self._queue[0]
+            if future.done():
+                heapq.heappop(self._queue)
+                continue
+            delay = max(
+                self.requests.delay(1) if self.requests else 0.0,
+                self.tokens.delay(tokens) if self.tokens else 0.0,
+            )
+            if delay > 0:
+                self._timer = asyncio.get_running_loop().call_later(
+                    delay, self._dispatch
+                )
+                break
+            heapq.heappop(self._queue)
+            if self.requests:
+                self.requests.consume(1)
+            if self.tokens:
+                self.tokens.consume(tokens)
+            future.set_result(None)
+        self.stats.queue_depth = len(self._queue)
+
+
+_schedulers: Dict[str, ModelScheduler] = {}
+
+
+def get_scheduler(model_name: str) -> ModelScheduler:
+    """
+    Get the scheduler shared by every call to a model, configured from `rate_limits` in settings.yaml.
+    """
+    if model_name not in _schedulers:
+        limit = get_configuration().rate_limits.get(model_name)
+        _schedulers[model_name] = ModelScheduler(
+            model_name,
+            rpm=limit.rpm if limit else None,
+            tpm=limit.tpm if limit else None,
+        )
+    return _schedulers[model_name]
+
+
+async def schedule(model_conf: ModelConfig, estimated_tokens: int) -> Ticket:
+    """
+    Wait until a request to the model is admitted, with the priority of its configuration.
+    """
+    return await get_scheduler(model_conf.model_name).acquire(
+        estimated_tokens, model_conf.priority
+    )
+
+
+def scheduler_stats() -> Dict[str, Dict[str, float]]:
+    """
+    Queue depth and wait time of every model scheduler.
+    """
+    return {name: s.stats.as_dict() for name, s in _schedulers.items()}
+
+
+def _scheduler_samples() -> Iterable[Sample]:
+    for name, scheduler in _schedulers.items():
+        stats = scheduler.stats
+        yield gauge_sample(
+            "deepsearch_scheduler_queue_depth",
+            "Requests waiting for admission",
+            stats.queue_depth,
+            model=name,
+        )
+        yield gauge_sample(
+            "deepsearch_scheduler_max_queue_depth",
+            "Maximum number of requests waiting for admission",
+            stats.max_queue_depth,
+            model=name,
+        )
+        yield counter_sample(
+            "deepsearch_scheduler_wait_seconds_total",
+            "Total time requests waited for admission",
+            stats.total_wait_seconds,
+            model=name,
+        )
+
+
+registry.register_collector(_scheduler_samples)
+
+
+def estimate_input_tokens(system_instructions: str | None, input: Any) -> int:
+    """
+    Estimate the prompt tokens of a request from its instructions and input items.
+    """
+    text = system_instructions or ""
+    if isinstance(input, str):
+        text += input
+    else:
+        for item in input:
+            content = item.get("content") if isinstance(item, dict) else None
+            text += content if isinstance(content, str) else str(item)
+    return count_tokens(text)
+
+
+class ScheduledModel(Model):
+    """
+    Wraps an agents SDK model so that planner turns go through the same scheduler
+    as the calls of the llm package.
+    """
+
+    def __init__(self, model: Model, model_conf: ModelConfig):
+        self.model = model
+        self.model_conf = model_conf
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.model, name)
+
+    def _estimate(self, args: tuple, kwargs: dict) -> int:
+        system_instructions = kwargs.get(
+            "system_instructions", args[0] if args else None
+        )
+        input = kwargs.get("input", args[1] if len(args) > 1 else "")
+        return estimate_input_tokens(system_instructions, input)
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        estimated_tokens = self._estimate(args, kwargs)
+        reservation = reserve(self.model_conf, estimated_tokens)
+        try:
+            ticket = await schedule(self.model_conf, estimated_tokens)
+            start = time.perf_counter()
+            response = await self.model.get_response(*args, **kwargs)
+        except BaseException as e:
+            reservation.cancel()
+            if isinstance(e, Exception):
+                errors.inc(stage="planner", error=type(e).__name__)
+            raise
+        ticket.settle(response.usage.total_tokens)
+        reservation.settle(response.usage.input_tokens, response.usage.output_tokens)
+        observe_model_request(
+            self.model_conf.model_name,
+            "planner",
+            time.perf_counter() - start,
+            response.usage.input_tokens,
+            response.usage.output_tokens,
+        )
+        return response
+
+    async def stream_response(  # type: ignore[override]
+        self, *args: Any, **kwargs: Any
+    ) -> AsyncIterator[Any]:
+        estimated_tokens = self._estimate(args, kwargs)
+        reservation = reserve(self.model_conf, estimated_tokens)
+        ticket: Ticket | None = None
+        usage = None
+        try:
+            ticket = await schedule(self.model_conf, estimated_tokens)
+            start = time.perf_counter()
+            async for event in self.model.stream_response(*args, **kwargs):
+                # the final response.completed event carries the usage
+                response = getattr(event, "response", None)
+                if getattr(response, "usage", None) is not None:
+                    usage = response.usage
+                    observe_model_request(
+                        self.model_conf.model_name,
+                        "planner",
+                        time.perf_counter() - start,
+                        usage.input_tokens,
+                        usage.output_tokens,
+                    )
+                yield event
+        except Exception as e:
+            errors.inc(stage="planner", error=type(e).__name__)
+            raise
+        finally:
+            if usage is None:
+                # no usage was reported (e.g. the stream failed): the prompt was sent once
+                # admitted, so the ticket keeps its estimate
+                if ticket is not None:
+                    ticket.settle(ticket.estimated_tokens)
+                reservation.cancel()
+            else:
+                if ticket is not None:
+                    ticket.settle(usage.total_tokens)
+                reservation.settle(usage.input_tokens, usage.output_tokens)
+
+
+def scheduled_model(role: str) -> ScheduledModel:
+    """
+    Build the scheduled SDK model for a role of settings.yaml (e.g. "planner"),
+    using the default OpenAI client.
+    """
+    from agents.models.openai_provider import OpenAIProvider
+
+    model_conf = get_configuration().get_model_config(role)
+    logger.info(f"Scheduling {role} turns on {model_conf.model_name}")
+    model = OpenAIProvider(use_responses=False).get_model(model_conf.model_name)
+    return ScheduledModel(model, model_conf)
@@ -0,0 +1,48 @@
+from functools import lru_cache
+from typing import Any
+
+from deepsearch_agents.log import logger
+
+# English text averages ~4 characters per token
+_CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model_name: str) -> Any | None:
+    try:
+        import tiktoken
+    except ImportError:
+        logger.warning("tiktoken is not installed, estimating tokens from length")
+        return None
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # the encoding files are downloaded on first use, which fails offline
+        logger.warning(f"Failed to load tokenizer for {model_name}: {e}")
+        return None
+
+
+def count_tokens(text: str, model_name: str = "gpt-4o") -> int:
+    """
+    Count the tokens of a text with the model's local tokenizer.
+    Falls back to a length-based estimate when the tokenizer is unavailable.
+    """
+    encoding = _get_encoding(model_name)
+    if encoding is None:
+        return len(text) // _CHARS_PER_TOKEN + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model_name: str = "gpt-4o") -> str:
+    """
+    Cut a text down to at most `max_tokens` tokens.
+    """
+    encoding = _get_encoding(model_name)
+    if encoding is None:
+        return text[: max_tokens * _CHARS_PER_TOKEN]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
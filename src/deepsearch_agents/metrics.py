@@ -0,0 +1,284 @@
+from bisect import bisect_left
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+from deepsearch_agents.cache import cache_stats
+
+Labels = Tuple[Tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+"""Latency buckets in seconds, from a cached lookup to a long LLM call"""
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    formatted = [f'{k}="{_escape(v)}"' for k, v in labels]
+    return "{" + ",".join(formatted) + "}" if formatted else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    A monotonically increasing value per label set.
+    """
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = _labels(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def _prometheus(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(labels)} {_format_value(value)}"
+            for labels, value in self.values.items()
+        ]
+
+    def _snapshot(self) -> List[Dict[str, Any]]:
+        return [
+            {"labels": dict(labels), "value": value}
+            for labels, value in self.values.items()
+        ]
+
+
+class Histogram:
+    """
+    Counts of observations in cumulative buckets, with their sum, per label set.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        # per label set: counts per bucket (the last one is +Inf), sum
+        self.values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _labels(labels)
+        if key not in self.values:
+            self.values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = self.values[key]
+        counts[bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def _prometheus(self) -> List[str]:
+        lines = []
+        for labels, (counts, total) in self.values.items():
+            cumulative = 0
+            for bound, count in zip([*self.buckets, float("inf")], counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                lines.append(
+                    f"{self.name}_bucket{_format_labels([*labels, ('le', le)])} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {total[0]!r}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+    def _snapshot(self) -> List[Dict[str, Any]]:
+        samples = []
+        for labels, (counts, total) in self.values.items():
+            count = sum(counts)
+            samples.append(
+                {
+                    "labels": dict(labels),
+                    "count": count,
+                    "sum": total[0],
+                    "mean": total[0] / count if count else 0.0,
+                    "buckets": dict(zip([*map(str, self.buckets), "+Inf"], counts)),
+                }
+            )
+        return samples
+
+
+class Sample(NamedTuple):
+    """
+    A value read by a collector at export time.
+    """
+
+    name: str
+    help: str
+    labels: Dict[str, Any]
+    value: float
+    type: str = "gauge"
+
+
+def gauge_sample(name: str, help: str, value: float, **labels: Any) -> Sample:
+    """A value that may go up and down, e.g. a queue depth"""
+    return Sample(name, help, labels, value)
+
+
+def counter_sample(name: str, help: str, value: float, **labels: Any) -> Sample:
+    """A monotonically increasing value kept outside the registry, named `*_total`"""
+    return Sample(name, help, labels, value, "counter")
+
+
+Collector = Callable[[], Iterable[Sample]]
+"""Collects samples at export time"""
+
+
+class MetricsRegistry:
+    """
+    Holds the metrics of the process and exports them in Prometheus text format or as JSON.
+    """
+
+    def __init__(self) -> None:
+        self.metrics: Dict[str, Counter | Histogram] = {}
+        self.collectors: List[Collector] = []
+
+    def counter(self, name: str, help: str) -> Counter:
+        if name not in self.metrics:
+            self.metrics[name] = Counter(name, help)
+        return self.metrics[name]  # type: ignore
+
+    def histogram(
+        self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        if name not in self.metrics:
+            self.metrics[name] = Histogram(name, help, buckets)
+        return self.metrics[name]  # type: ignore
+
+    def register_collector(self, collector: Collector) -> None:
+        self.collectors.append(collector)
+
+    def _collected(self) -> Dict[str, Tuple[str, str, List[Tuple[Labels, float]]]]:
+        """Samples of the collectors by name, as (type, help, samples)"""
+        collected: Dict[str, Tuple[str, str, List[Tuple[Labels, float]]]] = {}
+        for collector in self.collectors:
+            for sample in collector():
+                if sample.name not in collected:
+                    collected[sample.name] = (sample.type, sample.help, [])
+                collected[sample.name][2].append((_labels(sample.labels), sample.value))
+        return collected
+
+    def to_prometheus(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric._prometheus())
+        for name, (type, help, samples) in self._collected().items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {type}")
+            lines.extend(
+                f"{name}{_format_labels(labels)} {_format_value(value)}"
+                for labels, value in samples
+            )
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        ret: Dict[str, Any] = {
+            metric.name: {
+                "type": metric.type,
+                "help": metric.help,
+                "samples": metric._snapshot(),
+            }
+            for metric in self.metrics.values()
+        }
+        for name, (type, help, samples) in self._collected().items():
+            ret[name] = {
+                "type": type,
+                "help": help,
+                "samples": [
+                    {"labels": dict(labels), "value": value}
+                    for labels, value in samples
+                ],
+            }
+        return ret
+
+    def export(self, prometheus_path: str | None, json_path: str | None) -> None:
+        """
+        Write the metrics to the given files, a None path is skipped.
+        """
+        for path, text in [
+            (prometheus_path, self.to_prometheus),
+            (json_path, lambda: json.dumps(self.snapshot(), indent=2)),
+        ]:
+            if path is None:
+                continue
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w") as f:
+                f.write(text())
+
+
+registry = MetricsRegistry()
+
+tool_duration = registry.histogram(
+    "deepsearch_tool_duration_seconds", "Duration of tool calls by tool"
+)
+model_duration = registry.histogram(
+    "deepsearch_model_request_duration_seconds",
+    "Duration of model requests by model and kind (planner, completion, embedding)",
+)
+model_tokens = registry.counter(
+    "deepsearch_model_tokens_total", "Tokens used by model, kind and direction"
+)
+errors = registry.counter(
+    "deepsearch_errors_total",
+    "Errors by stage (llm, embedding, search, fetch, summarize)",
+)
+planner_input_tokens = registry.histogram(
+    "deepsearch_planner_input_tokens",
+    "Estimated input tokens of planner turns, before and after history compaction",
+    buckets=(1_000, 2_000, 4_000, 8_000, 16_000, 32_000, 64_000, 128_000),
+)
+deduplicated = registry.counter(
+    "deepsearch_deduplicated_total",
+    "Page fetches (page) and summaries (visit) shared with another task of the session",
+)
+
+
+def observe_model_request(
+    model: str, kind: str, seconds: float, input_tokens: int, output_tokens: int
+) -> None:
+    """
+    Record the latency and token usage of a successful model request.
+    """
+    model_duration.observe(seconds, model=model, kind=kind)
+    model_tokens.inc(input_tokens, model=model, kind=kind, direction="input")
+    model_tokens.inc(output_tokens, model=model, kind=kind, direction="output")
+
+
+def _cache_samples() -> Iterable[Sample]:
+    for name, stats in cache_stats().items():
+        yield counter_sample(
+            "deepsearch_cache_hits_total",
+            "Cache hits by cache",
+            stats["hits"],
+            cache=name,
+        )
+        yield counter_sample(
+            "deepsearch_cache_misses_total",
+            "Cache misses by cache",
+            stats["misses"],
+            cache=name,
+        )
+        yield gauge_sample(
+            "deepsearch_cache_hit_rate",
+            "Cache hit rate by cache",
+            stats["hit_rate"],
+            cache=name,
+        )
+
+
+registry.register_collector(_cache_samples)
@@ -1,7 +1,7 @@
 from abc import abstractmethod
 import asyncio
 import contextvars
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 import json
 from typing import List, cast
 
@@ -9,27 +9,59 @@ from agents import (
     Agent,
     AgentHooks,
     FunctionTool,
+    Model,
     ModelSettings,
     RunContextWrapper,
     Runner,
     Tool,
 )
+from agents.tool_context import ToolContext
 
 from deepsearch_agents import conf
 from deepsearch_agents.log import logger
+from deepsearch_agents.llm.budget import running_low
+from deepsearch_agents.llm.compaction import compacting_model
 from deepsearch_agents.context import TaskContext, Task
 from deepsearch_agents.tools import get_tool_instructions, sep
+from deepsearch_agents.tools.knowledge import list_out_relevant_knowledge
 
 
-def _build_instructions_and_tools(
+_single_action = "YOU CAN ONLY chose one of these actions."
+
+_parallel_actions = (
+    "You can take several of these actions at once when they don't depend on each other, "
+    "e.g. search two aspects of the question and visit URLs you already know in the same step. "
+    "Answer on its own, after the other actions are done."
+)
+
+_knowledge_section = """
+-Knowledge-
+
+What you have learned so far that is relevant to the question:
+{knowledge}
+"""
+
+_background_section = """
+-Background information-
+{knowledge}
+"""
+
+
+async def _build_instructions_and_tools(
     ctx: RunContextWrapper[TaskContext], agent: Agent[TaskContext]
 ) -> str:
     tool_names = "\n".join([f"{i}. {tool.name}" for i, tool in enumerate(agent.tools)])
+    if agent.model_settings.parallel_tool_calls:
+        choose_actions = _parallel_actions
+    else:
+        choose_actions = _single_action
     curr = ctx.context.current_task()
     if curr.query == curr.origin_query:
         question = f"The Question you are trying to answer is: {curr.query}"
     else:
         question = f"The Original Question is: {curr.origin_query}\n And you are currently focusing on this aspect of it. \n You are trying to answer this question: {curr.query}"
+    # only the most relevant knowledge, so the prompt does not grow with the session
+    knowledge = await list_out_relevant_knowledge(ctx)
 
     if not agent._running_out_of_token(ctx):
         return f"""
@@ -51,10 +83,10 @@ Given a question in any domain, do research to find the answer. Provide a detail
 
 -Question-
 {question}
-
+{_knowledge_section.format(knowledge=knowledge) if knowledge else ""}
 -Available actions-
 
-Here's the actions provided. YOU CAN ONLY chose one of these actions. DON'T use any other actions not listed here:
+Here's the actions provided. {choose_actions} DON'T use any other actions not listed here:
 
 {tool_names}
 
@@ -86,7 +118,7 @@ Using your best knowledge, conversation with the user and lessons learned, answe
 - When unsure, base your response on what we know so far.
 
 Let's keep things smooth and on track.
-
+{_background_section.format(knowledge=knowledge) if knowledge else ""}
 Base on the background information, take a best try, answer the question. 
 """
 
@@ -114,7 +146,7 @@ class Planner(Agent[TaskContext]):
         tools: List[Tool],
         task_generator: str | None = None,
         hooks: AgentHooks[TaskContext] | None = None,
-        model: str | None = None,
+        model: str | Model | None = None,
         model_settings: ModelSettings | None = None,
     ):
         super().__init__(
@@ -122,9 +154,15 @@ class Planner(Agent[TaskContext]):
             instructions=_build_instructions_and_tools,
             tools=tools,
             hooks=hooks,
-            model=model,
-            model_settings=model_settings,
+            # the history of older turns is compacted before it is re-sent
+            model=compacting_model(model),
+            # own copy, `tool_choice` is changed when running out of tokens
+            model_settings=(
+                replace(model_settings) if model_settings else ModelSettings()
+            ),
         )
+        # the tools as given, sub-task planners wrap the task generator again
+        self.base_tools = list(tools)
         self.task_generator = task_generator
         if task_generator:
             self._build_task_generate_tool()
@@ -190,6 +228,9 @@ class Planner(Agent[TaskContext]):
             )
             curr.sub_tasks[sub_task.id] = sub_task
             ctx.context.tasks[sub_task.id] = sub_task
+            ctx.context.emit(
+                "task_created", id=sub_task.id, query=q, level=sub_task.level
+            )
             tasks.append(sub_task)
         return tasks
 
@@ -198,10 +239,9 @@ class Planner(Agent[TaskContext]):
         return [tool.name for tool in self.tools]
 
     def _running_out_of_token(self, ctx: RunContextWrapper[TaskContext]) -> bool:
-        return (
-            ctx.usage.total_tokens
-            > conf.get_configuration().execution_config.max_token_usage * 0.85
-        )
+        # tokens of the whole session, including calls in flight; not the run's usage,
+        # which also holds the embedding tokens that only count in cost
+        return running_low(ctx.context)
 
     def _build_task_generate_tool(self) -> None:
         tool = next(tool for tool in self.tools if tool.name == self.task_generator)
@@ -211,7 +251,9 @@ class Planner(Agent[TaskContext]):
             tool, FunctionTool
         ), f"Task generator tool {self.task_generator} must be a FunctionTool"
 
-        async def execute_task(ctx: RunContextWrapper[TaskContext], input: str) -> str:
+        # the SDK hands a narrower context to wrappers annotated RunContextWrapper,
+        # the generator tool needs the whole ToolContext
+        async def execute_task(ctx: ToolContext[TaskContext], input: str) -> str:
             ret = await tool.on_invoke_tool(ctx, input)
             if not ret:
                 return "No new tasks generated."
@@ -252,7 +294,7 @@ class Planner(Agent[TaskContext]):
             new_task.set_as_current()
             p = Planner(
                 name=f"DeepSearch Agent-{new_task.id}",
-                tools=self.tools,
+                tools=self.base_tools,
                 task_generator=self.task_generator,
                 hooks=self.hooks,
                 model=self.model,
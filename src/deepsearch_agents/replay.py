@@ -0,0 +1,207 @@
+"""
+Record/replay of the HTTP exchanges with external services (OpenAI, SerpAPI, Jina).
+
+In record mode every request made through the shared HTTP client and the OpenAI clients
+is forwarded to the real service and appended to a JSONL fixture file. In replay mode the
+fixture serves as a local stand-in for all three services, with configurable injected
+latency, so full Planner runs are reproducible, offline and free.
+"""
+
+import asyncio
+import base64
+from collections import defaultdict, deque
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Deque, Dict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+from deepsearch_agents.conf import get_configuration
+from deepsearch_agents.log import logger
+
+# query parameters carrying credentials are never written to the fixture
+_secret_params = {"api_key", "key", "token"}
+
+# the recorded body is already decoded
+_dropped_headers = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+def _endpoint(request: httpx.Request) -> str:
+    url = request.url
+    query = urlencode(
+        sorted(
+            (k, v)
+            for k, v in parse_qsl(url.query.decode(), keep_blank_values=True)
+            if k not in _secret_params
+        )
+    )
+    return f"{request.method} {urlunsplit((url.scheme, url.netloc.decode(), url.path, query, ''))}"
+
+
+def _body_hash(content: bytes) -> str:
+    try:
+        content = json.dumps(json.loads(content), sort_keys=True).encode()
+    except ValueError:
+        pass
+    return hashlib.sha256(content).hexdigest()
+
+
+def _encode_body(content: bytes) -> Dict[str, str]:
+    try:
+        return {"text": content.decode()}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(content).decode()}
+
+
+def _decode_body(body: Dict[str, str]) -> bytes:
+    if "base64" in body:
+        return base64.b64decode(body["base64"])
+    return body["text"].encode()
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """
+    Forwards requests to the real service and appends every exchange to a JSONL fixture.
+    """
+
+    def __init__(self, fixture: str, inner: httpx.AsyncBaseTransport | None = None):
+        self.fixture = fixture
+        self.inner = inner or httpx.AsyncHTTPTransport()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(fixture) or ".", exist_ok=True)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        request_body = await request.aread()
+        start = time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        content = await response.aread()
+        latency = time.perf_counter() - start
+        headers = [
+            (k, v)
+            for k, v in response.headers.multi_items()
+            if k.lower() not in _dropped_headers
+        ]
+        exchange = {
+            "endpoint": _endpoint(request),
+            "body_hash": _body_hash(request_body),
+            "status": response.status_code,
+            "headers": headers,
+            "body": _encode_body(content),
+            "latency": latency,
+        }
+        with self._lock, open(self.fixture, "a") as f:
+            f.write(json.dumps(exchange) + "\n")
+        return httpx.Response(
+            response.status_code, headers=headers, content=content, request=request
+        )
+
+    async def aclose(self) -> None:
+        # shared by several clients, closing one of them must not break the others
+        pass
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Serves recorded exchanges. A request is matched by endpoint and body first; requests whose
+    body changed between runs (e.g. prompts containing the current date) get the next unserved
+    exchange recorded for the same endpoint.
+    """
+
+    def __init__(
+        self, fixture: str, latency: float | None = None, latency_scale: float = 1.0
+    ):
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self._exact: Dict[tuple[str, str], Deque[dict]] = defaultdict(deque)
+        self._by_endpoint: Dict[str, Deque[dict]] = defaultdict(deque)
+        with open(fixture) as f:
+            for index, line in enumerate(f):
+                if not line.strip():
+                    continue
+                exchange = json.loads(line)
+                exchange["index"] = index
+                self._exact[(exchange["endpoint"], exchange["body_hash"])].append(
+                    exchange
+                )
+                self._by_endpoint[exchange["endpoint"]].append(exchange)
+        self._served: set[int] = set()
+
+    def _next(self, queue: Deque[dict]) -> dict | None:
+        while queue:
+            exchange = queue.popleft()
+            if exchange["index"] not in self._served:
+                self._served.add(exchange["index"])
+                return exchange
+        return None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        endpoint = _endpoint(request)
+        body_hash = _body_hash(await request.aread())
+        exchange = self._next(self._exact[(endpoint, body_hash)]) or self._next(
+            self._by_endpoint[endpoint]
+        )
+        if exchange is None:
+            raise httpx.ConnectError(
+                f"No recorded exchange left for {endpoint}", request=request
+            )
+        delay = (
+            self.latency
+            if self.latency is not None
+            else exchange["latency"] * self.latency_scale
+        )
+        await asyncio.sleep(delay)
+        return httpx.Response(
+            exchange["status"],
+            headers=exchange["headers"],
+            content=_decode_body(exchange["body"]),
+            request=request,
+        )
+
+
+_transport: httpx.AsyncBaseTransport | None = None
+
+
+def get_transport() -> httpx.AsyncBaseTransport | None:
+    """
+    Get the transport for all external HTTP traffic according to the replay configuration.
+    Returns None when neither recording nor replaying, i.e. the default network transport.
+    """
+    global _transport
+    replay_conf = get_configuration().replay_config
+    if replay_conf.mode == "off":
+        return None
+    if _transport is None:
+        if replay_conf.mode == "record":
+            logger.info(f"Recording external exchanges to {replay_conf.fixture}")
+            _transport = RecordingTransport(replay_conf.fixture)
+        else:
+            logger.info(f"Replaying external exchanges from {replay_conf.fixture}")
+            _transport = ReplayTransport(
+                replay_conf.fixture,
+                latency=replay_conf.latency,
+                latency_scale=replay_conf.latency_scale,
+            )
+    return _transport
+
+
+def set_transport(transport: httpx.AsyncBaseTransport | None) -> None:
+    """
+    Replace the transport, e.g. with a ReplayTransport built from another fixture.
+    Clients built afterwards pick it up.
+    """
+    global _transport
+    _transport = transport
+
+
+def openai_http_client() -> httpx.AsyncClient | None:
+    """
+    HTTP client for the OpenAI clients, routed through the record/replay transport if enabled.
+    """
+    transport = get_transport()
+    if transport is None:
+        return None
+    return httpx.AsyncClient(transport=transport, timeout=600, follow_redirects=True)
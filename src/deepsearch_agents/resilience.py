@@ -0,0 +1,189 @@
+import asyncio
+from collections import deque
+import random
+import time
+from typing import Awaitable, Callable, Deque, Dict, Iterable, TypeVar
+
+import httpx
+import openai
+
+from deepsearch_agents.conf import RetryConfig, get_configuration
+from deepsearch_agents.log import logger
+from deepsearch_agents.metrics import Sample, counter_sample, registry
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+
+def is_retryable(e: BaseException) -> bool:
+    """
+    Whether an error is transient: timeouts, dropped connections, throttling and server errors.
+    """
+    if isinstance(e, (asyncio.TimeoutError, httpx.TransportError)):
+        return True
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code in RETRYABLE_STATUS
+    if isinstance(e, (openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    if isinstance(e, openai.APIStatusError):
+        return e.status_code in RETRYABLE_STATUS
+    return False
+
+
+def _retry_after(e: BaseException) -> float | None:
+    response = getattr(e, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def backoff_delay(attempt: int, policy: RetryConfig) -> float:
+    """
+    Full-jitter exponential backoff: a random delay in [0, min(max_delay, base_delay * 2^attempt)].
+    """
+    return random.uniform(0, min(policy.max_delay, policy.base_delay * 2**attempt))
+
+
+async def retry(
+    call: Callable[[], Awaitable[T]],
+    name: str,
+    deadline: float | None = None,
+    policy: RetryConfig | None = None,
+) -> T:
+    """
+    Run `call`, retrying retryable errors with jittered exponential backoff.
+
+    Args:
+        call: Builds a fresh awaitable for every attempt.
+        name: Label of the call in the logs.
+        deadline: Seconds the call may take in total, over all attempts and backoffs (None means no deadline).
+        policy: Retry settings, defaults to the `retry` section of settings.yaml.
+    """
+    policy = policy or get_configuration().retry_config
+    expires_at = time.monotonic() + deadline if deadline is not None else None
+    attempt = 0
+    while True:
+        remaining = expires_at - time.monotonic() if expires_at is not None else None
+        try:
+            if remaining is None:
+                return await call()
+            if remaining <= 0:
+                raise asyncio.TimeoutError()
+            return await asyncio.wait_for(call(), remaining)
+        except Exception as e:
+            attempt += 1
+            if not is_retryable(e) or attempt >= policy.max_attempts:
+                raise
+            delay = _retry_after(e) or backoff_delay(attempt, policy)
+            if expires_at is not None and time.monotonic() + delay >= expires_at:
+                raise
+            logger.warning(
+                f"{name} failed ({type(e).__name__}: {e}), retry {attempt}/{policy.max_attempts - 1} in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+
+
+class LatencyTracker:
+    """
+    Keeps the latencies of the most recent successful calls to estimate tail percentiles.
+    """
+
+    def __init__(self, window: int = 200):
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, p: float) -> float | None:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)]
+
+
+_trackers: Dict[str, LatencyTracker] = {}
+
+hedge_stats: Dict[str, int] = {"hedged": 0, "hedge_won": 0}
+
+
+def _hedge_samples() -> Iterable[Sample]:
+    yield counter_sample(
+        "deepsearch_hedged_requests_total",
+        "Requests that were hedged with a duplicate",
+        hedge_stats["hedged"],
+    )
+    yield counter_sample(
+        "deepsearch_hedge_wins_total",
+        "Hedged requests answered first by the duplicate",
+        hedge_stats["hedge_won"],
+    )
+
+
+registry.register_collector(_hedge_samples)
+
+
+def latency_tracker(name: str) -> LatencyTracker:
+    if name not in _trackers:
+        _trackers[name] = LatencyTracker()
+    return _trackers[name]
+
+
+async def hedged(
+    call: Callable[[], Awaitable[T]],
+    name: str,
+    policy: RetryConfig | None = None,
+) -> T:
+    """
+    Run `call`, and if it is still pending after the configured latency percentile of
+    previous `name` calls, race it against a duplicate. The first success wins and the
+    other attempt is cancelled; an error is raised only when both attempts fail.
+    """
+    policy = policy or get_configuration().retry_config
+    tracker = latency_tracker(name)
+    threshold = tracker.percentile(policy.hedge_percentile)
+    if (
+        not policy.hedge
+        or threshold is None
+        or len(tracker.samples) < policy.hedge_min_samples
+    ):
+        start = time.monotonic()
+        result = await call()
+        tracker.observe(time.monotonic() - start)
+        return result
+
+    start = time.monotonic()
+    primary = asyncio.ensure_future(call())
+    pending = {primary}
+    try:
+        done, _ = await asyncio.wait(pending, timeout=threshold)
+        if done:
+            tracker.observe(time.monotonic() - start)
+            return primary.result()
+
+        hedge_stats["hedged"] += 1
+        logger.debug(
+            f"{name} slower than p{policy.hedge_percentile} ({threshold:.2f}s), hedging"
+        )
+        backup = asyncio.ensure_future(call())
+        pending.add(backup)
+        error: BaseException | None = None
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    tracker.observe(time.monotonic() - start)
+                    if task is backup:
+                        hedge_stats["hedge_won"] += 1
+                    return task.result()
+                error = task.exception()
+        assert error is not None
+        raise error
+    finally:
+        # the losing attempt, or both when the caller gave up
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,210 @@
+"""
+HTTP service running many research sessions concurrently in one process.
+
+    POST /sessions          {"query": "..."} -> 202 {"id": ..., "status": "pending"}
+                            with ?wait=true, waits and returns the finished session
+    POST /sessions/stream   {"query": "..."} -> server-sent events of the session's progress
+                            and answer tokens, the last one is `session_finished`
+    GET  /sessions/{id}     status, answer and usage of a session
+    GET  /metrics           metrics in Prometheus text format
+    GET  /health
+
+Run with:
+    python -m deepsearch_agents.server
+"""
+
+import asyncio
+import json
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Set
+import uuid
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import (
+    JSONResponse,
+    PlainTextResponse,
+    Response,
+    StreamingResponse,
+)
+from starlette.routing import Route
+
+from deepsearch_agents.cache import cache_stats
+from deepsearch_agents.conf import get_configuration
+from deepsearch_agents.log import logger
+from deepsearch_agents.metrics import registry
+from deepsearch_agents.events import SessionEvent
+from deepsearch_agents.session import (
+    SessionResult,
+    configure_openai,
+    run_session,
+    stream_session,
+)
+from deepsearch_agents.tools._http import aclose_http_client
+
+
+class SessionManager:
+    """
+    Runs sessions in the background, at most `max_concurrent` at a time, and keeps
+    the last `keep` finished sessions for their results to be fetched.
+    """
+
+    def __init__(self, max_concurrent: int, keep: int):
+        self.keep = keep
+        self.sessions: OrderedDict[str, SessionResult] = OrderedDict()
+        self.tasks: Dict[str, asyncio.Task] = {}
+        # ids of submitted and streamed sessions that have not finished yet
+        self.running: Set[str] = set()
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    def submit(self, query: str) -> SessionResult:
+        session = SessionResult(id=uuid.uuid4().hex, query=query)
+        self.sessions[session.id] = session
+        self.running.add(session.id)
+        self.tasks[session.id] = asyncio.create_task(self._run(session))
+        self._evict()
+        return session
+
+    async def _run(self, session: SessionResult) -> SessionResult:
+        try:
+            async with self._semaphore:
+                return await run_session(session.query, session)
+        finally:
+            self.tasks.pop(session.id, None)
+            self.running.discard(session.id)
+
+    async def stream(self, query: str) -> AsyncIterator[SessionEvent]:
+        """
+        Run a session while its listener streams its events, it counts against the
+        concurrency limit and can be fetched by id like submitted ones.
+        """
+        session = SessionResult(id=uuid.uuid4().hex, query=query)
+        self.sessions[session.id] = session
+        self.running.add(session.id)
+        self._evict()
+        try:
+            async with self._semaphore:
+                async for event in stream_session(query, session):
+                    yield event
+        finally:
+            self.running.discard(session.id)
+
+    async def wait(self, session_id: str) -> SessionResult:
+        task = self.tasks.get(session_id)
+        if task is not None:
+            await asyncio.shield(task)
+        return self.sessions[session_id]
+
+    def _evict(self) -> None:
+        finished = [id for id in self.sessions if id not in self.running]
+        for id in finished[: max(len(finished) - self.keep, 0)]:
+            del self.sessions[id]
+
+    async def aclose(self) -> None:
+        for task in self.tasks.values():
+            task.cancel()
+        await asyncio.gather(*self.tasks.values(), return_exceptions=True)
+
+
+async def _read_query(request: Request) -> str | Response:
+    try:
+        body = await request.json()
+    except ValueError:
+        return JSONResponse({"error": "body must be JSON"}, status_code=400)
+    query = body.get("query") if isinstance(body, dict) else None
+    if not isinstance(query, str) or not query.strip():
+        return JSONResponse({"error": "query is required"}, status_code=400)
+    return query.strip()
+
+
+async def create_session(request: Request) -> Response:
+    manager: SessionManager = request.app.state.sessions
+    query = await _read_query(request)
+    if isinstance(query, Response):
+        return query
+
+    session = manager.submit(query)
+    if request.query_params.get("wait") in ("1", "true"):
+        session = await manager.wait(session.id)
+        return JSONResponse(session.model_dump(mode="json"))
+    return JSONResponse(session.model_dump(mode="json"), status_code=202)
+
+
+async def stream_session_events(request: Request) -> Response:
+    manager: SessionManager = request.app.state.sessions
+    query = await _read_query(request)
+    if isinstance(query, Response):
+        return query
+
+    async def sse() -> AsyncIterator[str]:
+        async for event in manager.stream(query):
+            yield f"event: {event.type}\ndata: {json.dumps(event.model_dump(mode='json'))}\n\n"
+
+    return StreamingResponse(
+        sse(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def get_session(request: Request) -> Response:
+    manager: SessionManager = request.app.state.sessions
+    session = manager.sessions.get(request.path_params["session_id"])
+    if session is None:
+        return JSONResponse({"error": "unknown session"}, status_code=404)
+    return JSONResponse(session.model_dump(mode="json"))
+
+
+async def metrics(request: Request) -> Response:
+    return PlainTextResponse(
+        registry.to_prometheus(), media_type="text/plain; version=0.0.4"
+    )
+
+
+async def health(request: Request) -> Response:
+    manager: SessionManager = request.app.state.sessions
+    return JSONResponse(
+        {
+            "status": "ok",
+            "running_sessions": len(manager.running),
+            "cache_stats": cache_stats(),
+        }
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette) -> AsyncIterator[None]:
+    server_conf = get_configuration().server_config
+    configure_openai()
+    app.state.sessions = SessionManager(
+        server_conf.max_concurrent_sessions, server_conf.keep_sessions
+    )
+    yield
+    await app.state.sessions.aclose()
+    await aclose_http_client()
+
+
+def create_app() -> Starlette:
+    return Starlette(
+        routes=[
+            Route("/sessions", create_session, methods=["POST"]),
+            Route("/sessions/stream", stream_session_events, methods=["POST"]),
+            Route("/sessions/{session_id}", get_session, methods=["GET"]),
+            Route("/metrics", metrics, methods=["GET"]),
+            Route("/health", health, methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
+
+
+def main() -> None:
+    import uvicorn
+
+    server_conf = get_configuration().server_config
+    logger.info(f"Serving on http://{server_conf.host}:{server_conf.port}")
+    uvicorn.run(create_app(), host=server_conf.host, port=server_conf.port)
+
+
+if __name__ == "__main__":
+    main()
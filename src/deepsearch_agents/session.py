@@ -0,0 +1,228 @@
+import asyncio
+import time
+from typing import AsyncIterator, Dict, Literal, Set, Tuple
+import uuid
+
+from agents import (
+    AgentHooks,
+    Runner,
+    RunResultStreaming,
+    gen_trace_id,
+    set_default_openai_api,
+    set_default_openai_client,
+    set_tracing_export_api_key,
+    trace,
+)
+from openai import AsyncOpenAI
+from pydantic import BaseModel, Field
+
+from deepsearch_agents.conf import get_configuration
+from deepsearch_agents.context import Answer, TaskContext, build_task_context
+from deepsearch_agents.events import AnswerFieldExtractor, EventStream, SessionEvent
+from deepsearch_agents.hooks import Hooks
+from deepsearch_agents.llm.budget import BudgetExceeded
+from deepsearch_agents.llm.scheduler import scheduled_model
+from deepsearch_agents.log import logger
+from deepsearch_agents.planner import Planner
+from deepsearch_agents.replay import openai_http_client
+from deepsearch_agents.tools import answer, reflect, search, visit
+from deepsearch_agents.tools.answer import ANSWER_ACCEPTED
+
+
+class SessionResult(BaseModel):
+    """
+    Outcome and usage of a research session.
+    """
+
+    id: str
+    query: str
+    status: Literal["pending", "running", "done", "out_of_budget", "failed"] = (
+        "pending"
+    )
+    answer: Answer | None = None
+    final_output: str | None = None
+    usage: Dict[str, int] = Field(default_factory=dict)
+    """Token usage of the whole session"""
+    ledger: Dict[str, Dict[str, float]] = Field(default_factory=dict)
+    """Tokens and cost by model"""
+    cost: float = 0.0
+    """Cost in USD"""
+    duration: float | None = None
+    """Seconds the session ran"""
+    error: str | None = None
+
+
+def configure_openai() -> None:
+    """
+    Make the agents SDK use a client on the shared, replay-aware HTTP transport.
+    Call once per process before running sessions.
+    """
+    config = get_configuration()
+    client = AsyncOpenAI(
+        base_url=config.openai_base_url if config else None,
+        api_key=config.openai_api_key,
+        http_client=openai_http_client(),
+    )
+    set_default_openai_client(client)
+    set_tracing_export_api_key(config.tracing_openai_api_key)
+    set_default_openai_api("chat_completions")
+
+
+def build_planner(hooks: AgentHooks[TaskContext] | None = None) -> Planner:
+    """
+    Build the root planner of a session. Every session gets its own planner, the planner
+    changes its tools and model settings while it runs.
+    """
+    planner_conf = get_configuration().get_model_config("planner")
+    return Planner(
+        name="DeepSearch Agent",
+        tools=[search, visit, answer, reflect],
+        task_generator="reflect",
+        hooks=hooks or Hooks(),
+        model=scheduled_model("planner"),
+        model_settings=planner_conf.as_model_settings(),
+    )
+
+
+async def run_session(
+    query: str,
+    session: SessionResult | None = None,
+    hooks: AgentHooks[TaskContext] | None = None,
+) -> SessionResult:
+    """
+    Research a query and return its answer and usage.
+
+    The session runs in its own asyncio task, so its current task and budget are isolated
+    from other sessions running concurrently; HTTP connection pools, caches and rate
+    limits are shared. Pass `session` to follow its status while it runs.
+    """
+    session = session or SessionResult(id=uuid.uuid4().hex, query=query)
+    return await asyncio.create_task(_run_session(query, session, hooks))
+
+
+async def stream_session(
+    query: str,
+    session: SessionResult | None = None,
+    hooks: AgentHooks[TaskContext] | None = None,
+) -> AsyncIterator[SessionEvent]:
+    """
+    Research a query like `run_session`, yielding its progress as it happens: tasks created,
+    tool calls, knowledge found, tasks solved, then the final answer token by token.
+    The last event is `session_finished`, carrying the SessionResult.
+    """
+    session = session or SessionResult(id=uuid.uuid4().hex, query=query)
+    events = EventStream()
+    task = asyncio.create_task(_run_session(query, session, hooks, events))
+    try:
+        async for event in events:
+            yield event
+    finally:
+        # the listener went away, e.g. the client disconnected
+        if not task.done():
+            task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+async def _run_session(
+    query: str,
+    session: SessionResult,
+    hooks: AgentHooks[TaskContext] | None,
+    events: EventStream | None = None,
+) -> SessionResult:
+    config = get_configuration()
+    start = time.perf_counter()
+    session.status = "running"
+    context = build_task_context(query)
+    context.events = events
+    context.emit("task_created", id=context.current_task_id(), query=query, level=1)
+    try:
+        with trace(workflow_name="deepsearch", trace_id=gen_trace_id()):
+            if events is None:
+                ret = await Runner.run(
+                    starting_agent=build_planner(hooks),
+                    input=query,
+                    context=context,
+                    max_turns=config.execution_config.max_turns,
+                )
+            else:
+                ret = Runner.run_streamed(
+                    starting_agent=build_planner(hooks),
+                    input=query,
+                    context=context,
+                    max_turns=config.execution_config.max_turns,
+                )
+                await _stream_answer(ret, events)
+        session.final_output = str(ret.final_output)
+        session.status = "done"
+    except BudgetExceeded as e:
+        logger.warning(f"Session {session.id} stopped, out of budget: {e}")
+        session.status = "out_of_budget"
+        session.error = str(e)
+    except Exception as e:
+        logger.error(f"Session {session.id} failed: {e}")
+        session.status = "failed"
+        session.error = str(e)
+
+    usage = context.usage()
+    ledger = context.ledger()
+    session.answer = context.final_answer()
+    session.usage = {
+        "requests": usage.requests,
+        "input_tokens": usage.input_tokens,
+        "output_tokens": usage.output_tokens,
+        "total_tokens": usage.total_tokens,
+    }
+    session.ledger = ledger.as_dict()
+    session.cost = ledger.cost
+    session.duration = time.perf_counter() - start
+    if events is not None:
+        events.emit("session_finished", **session.model_dump(mode="json"))
+        events.close()
+    return session
+
+
+async def _stream_answer(result: RunResultStreaming, events: EventStream) -> None:
+    """
+    Forward the answer of the root planner as it is generated: the `answer` argument
+    of its answer tool calls, or its text output.
+
+    Every draft is evaluated once its call is complete. Its deltas carry the `call_id`
+    of the call, followed by `answer_accepted` or `answer_rejected` with the same
+    `call_id`; the text of a rejected draft is to be discarded. Text output is not
+    evaluated and has no `call_id`.
+    """
+    extractors: Dict[int, Tuple[str, AnswerFieldExtractor]] = {}
+    answer_calls: Set[str] = set()
+    async for event in result.stream_events():
+        if event.type == "run_item_stream_event":
+            if event.name != "tool_output":
+                continue
+            raw = event.item.raw_item
+            call_id = raw.get("call_id") if isinstance(raw, dict) else raw.call_id
+            if call_id in answer_calls:
+                answer_calls.discard(call_id)
+                accepted = event.item.output == ANSWER_ACCEPTED
+                events.emit(
+                    "answer_accepted" if accepted else "answer_rejected",
+                    call_id=call_id,
+                )
+            continue
+        if event.type != "raw_response_event":
+            continue
+        data = event.data
+        if data.type == "response.output_item.added":
+            # output indexes restart with every turn
+            extractors.pop(data.output_index, None)
+            item = data.item
+            if item.type == "function_call" and item.name == "answer":
+                extractors[data.output_index] = (item.call_id, AnswerFieldExtractor())
+                answer_calls.add(item.call_id)
+        elif data.type == "response.function_call_arguments.delta":
+            if data.output_index not in extractors:
+                continue
+            call_id, extractor = extractors[data.output_index]
+            delta = extractor.feed(data.delta)
+            if delta:
+                events.emit("answer_delta", delta=delta, call_id=call_id)
+        elif data.type == "response.output_text.delta" and data.delta:
+            events.emit("answer_delta", delta=data.delta, call_id=None)
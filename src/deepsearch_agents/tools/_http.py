@@ -0,0 +1,80 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import httpx
+
+from deepsearch_agents.conf import get_configuration
+from deepsearch_agents.replay import get_transport
+
+
+_client: httpx.AsyncClient | None = None
+_fetch_semaphore: asyncio.Semaphore | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared async HTTP client.
+
+    The client keeps a keep-alive connection pool, so every tool that talks to
+    an external HTTP service (Jina reader, SerpAPI) reuses the same connections
+    instead of paying a TCP/TLS handshake per request.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        fetch_conf = get_configuration().fetch_config
+        _client = httpx.AsyncClient(
+            timeout=default_timeout(),
+            limits=httpx.Limits(
+                max_connections=fetch_conf.max_connections,
+                max_keepalive_connections=fetch_conf.max_keepalive_connections,
+                keepalive_expiry=fetch_conf.keepalive_expiry,
+            ),
+            follow_redirects=True,
+            transport=get_transport(),
+        )
+    return _client
+
+
+def set_http_client(client: httpx.AsyncClient | None) -> None:
+    """
+    Replace the shared HTTP client, e.g. with one using a mock transport.
+    Passing None makes the next `get_http_client` call build a fresh client.
+    """
+    global _client
+    _client = client
+
+
+async def aclose_http_client() -> None:
+    """Close the shared HTTP client and release its pooled connections."""
+    global _client, _fetch_semaphore
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _fetch_semaphore = None
+
+
+def default_timeout(
+    connect: float | None = None, read: float | None = None
+) -> httpx.Timeout:
+    """
+    Build a per-request timeout, falling back to the configured connect/read timeouts.
+    """
+    fetch_conf = get_configuration().fetch_config
+    connect = fetch_conf.connect_timeout if connect is None else connect
+    read = fetch_conf.read_timeout if read is None else read
+    return httpx.Timeout(connect=connect, read=read, write=read, pool=read)
+
+
+@asynccontextmanager
+async def fetch_slot() -> AsyncIterator[None]:
+    """
+    Bound the number of page fetches in flight across all concurrently running tasks.
+    """
+    global _fetch_semaphore
+    if _fetch_semaphore is None:
+        _fetch_semaphore = asyncio.Semaphore(
+            get_configuration().fetch_config.max_concurrency
+        )
+    async with _fetch_semaphore:
+        yield
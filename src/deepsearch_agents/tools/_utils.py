@@ -1,15 +1,20 @@
+import asyncio
 import re
 from typing import Any, Callable, Dict, List
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
 from agents import RunContextWrapper
 from pydantic import BaseModel
 from deepsearch_agents import conf
 from deepsearch_agents.context import TaskContext
+from deepsearch_agents.llm.tokens import count_tokens, truncate_to_tokens
 from deepsearch_agents.log import logger
 
 
 tool_instructions: Dict[str, Callable[[TaskContext | None], str]] = {}
 
+_stage_semaphores: Dict[str, asyncio.Semaphore] = {}
+
 
 def get_tool_instructions(ctx: TaskContext, tool_names: List[str]) -> str:
     """
@@ -37,6 +42,15 @@ def track_usage(
     return wrapper
 
 
+def stage_semaphore(stage: str, limit: int) -> asyncio.Semaphore:
+    """
+    Get the semaphore bounding the concurrency of a pipeline stage, shared by all running tasks.
+    """
+    if stage not in _stage_semaphores:
+        _stage_semaphores[stage] = asyncio.Semaphore(limit)
+    return _stage_semaphores[stage]
+
+
 def log_action(
     ctx: RunContextWrapper[TaskContext],
     action: str,
@@ -64,9 +78,73 @@ def log_action(
     logger.info(tolog)
 
 
+_cut_marker = " [...]"
+
+
+def cap_tool_output(tool: str, header: str, entries: List[str]) -> str:
+    """
+    Join the header and entries of a tool result, leaving out the entries beyond the
+    tool's token cap (`tool_output.max_tokens`). A first entry over the cap on its own
+    is shortened to fit instead.
+    """
+    config = conf.get_configuration()
+    max_tokens = config.tool_output_config.max_tokens.get(tool)
+    if max_tokens is None:
+        return "\n".join([header, *entries])
+    model_name = config.get_model_config("planner").model_name
+    used = count_tokens(header, model_name)
+    kept = []
+    for entry in entries:
+        tokens = count_tokens(entry, model_name) + 1
+        if used + tokens > max_tokens:
+            if not kept:
+                room = max_tokens - used - count_tokens(_cut_marker, model_name) - 1
+                kept.append(
+                    truncate_to_tokens(entry, max(room, 0), model_name) + _cut_marker
+                )
+            break
+        used += tokens
+        kept.append(entry)
+    if len(kept) < len(entries):
+        kept.append(f"({len(entries) - len(kept)} more left out)")
+    return "\n".join([header, *kept])
+
+
 def remove_markdown_link(content: str) -> str:
     return re.sub(
         r"\[([^\]]*)\]\([^\)]+\)",
         lambda m: m.group(1) if m.group(1) else "",
         content,
     )
+
+
+# parameters only used to track visitors, never to select the content of a page
+_tracking_params = re.compile(
+    r"^(utm_.*|fbclid|gclid|dclid|msclkid|mc_cid|mc_eid|ref_src)$"
+)
+
+# subdomains serving the same pages as the domain they are part of
+_mirror_subdomains = re.compile(r"^(www\d*|m|mobile|amp)\.(?=[^.]+\.[^.]+)")
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL so that trivially different spellings of the same page compare equal:
+    lowercase scheme and host, no www/mobile/AMP subdomain, no default port,
+    no fragment, no tracking parameters, sorted query parameters and no trailing slash.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or "https"
+    # only when a domain of two labels remains: amp.dev and m.me are sites of their own
+    host = _mirror_subdomains.sub("", (parts.hostname or "").lower())
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    query = urlencode(
+        sorted(
+            (k, v)
+            for k, v in parse_qsl(parts.query, keep_blank_values=True)
+            if not _tracking_params.match(k.lower())
+        )
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((scheme, host, path, query, ""))
@@ -24,6 +24,9 @@ def answer_description(ctx: Optional[TaskContext] = None) -> str:
 
 tool_instructions["answer"] = answer_description
 
+ANSWER_ACCEPTED = "You have provided a final verified answer with references. Congratulations! You have completed the task. Our conversation ends here."
+"""Result of an answer that passed the evaluation"""
+
 
 @function_tool
 async def answer(
@@ -56,7 +59,12 @@ async def answer(
         return f"Error in answer: {e}"
 
     if evaluation.is_pass:
-        return "You have provided a final verified answer with references. Congratulations! You have completed the task. Our conversation ends here."
+        ctx.context.emit(
+            "task_solved",
+            answer=answer,
+            references=[r.model_dump(mode="json") for r in references],
+        )
+        return ANSWER_ACCEPTED
     else:
         return f"""
 You have draft an answer, but it's not good enough.
@@ -12,6 +12,7 @@ from deepsearch_agents.context import (
     build_task_context,
 )
 from deepsearch_agents.llm.llm import get_response
+from deepsearch_agents.tools.knowledge import list_out_relevant_knowledge
 from deepsearch_agents.log import logger
 
 
@@ -38,6 +39,9 @@ Here is the answer I provided:
 
 Here are the references I used:
 {references}
+
+Here are the knowledge items I used:
+{knowledge}
 """
 
 
@@ -65,7 +69,10 @@ async def evaluate_answer(
     ret = await get_response(
         model="evaluate",
         input=USER_PROMPT.format(
-            question=question, answer=answer, references=references
+            question=question,
+            answer=answer,
+            references=references,
+            knowledge=await list_out_relevant_knowledge(ctx) or "None",
         ),
         output_type=Evaluation,
         system_instructions=EVALUATION_PROMPT,
@@ -0,0 +1,95 @@
+from typing import List
+
+from agents import RunContextWrapper
+
+from deepsearch_agents.conf import get_configuration
+from deepsearch_agents.context import Knowledge, TaskContext
+from deepsearch_agents.llm.tokens import count_tokens
+from deepsearch_agents.log import logger
+from deepsearch_agents.metrics import errors
+from deepsearch_agents.tools.pick import _get_embeddings_batch, _question_embeddings
+
+
+def knowledge_text(knowledge: Knowledge) -> str:
+    """The text a knowledge item is embedded by"""
+    return "\n".join(
+        [knowledge.reference.title, knowledge.summary or "", *knowledge.quotes]
+    )
+
+
+async def index_knowledge(
+    ctx: RunContextWrapper[TaskContext], knowledges: List[Knowledge]
+) -> None:
+    """
+    Embed new knowledge items, in one batch, into the knowledge index of the session.
+    Items whose embedding fails are kept pending and retried with the next batch.
+    """
+    index = ctx.context.knowledge
+    new = [k for k in knowledges if k not in index]
+    index.pending.extend(new)
+    new = list(index.pending)
+    if not new:
+        return
+    try:
+        embeddings = await _get_embeddings_batch(
+            ctx, "embedding", [knowledge_text(k) for k in new]
+        )
+    except Exception as e:
+        errors.inc(stage="embedding", error=type(e).__name__)
+        logger.error(f"Error indexing {len(new)} knowledge items: {e}")
+        return
+    for knowledge, embedding in zip(new, embeddings):
+        index.add(knowledge, embedding)
+
+
+async def relevant_knowledge(
+    ctx: RunContextWrapper[TaskContext],
+    top_k: int | None = None,
+    max_tokens: int | None = None,
+) -> List[Knowledge]:
+    """
+    The knowledge of the session most relevant to the current task's question, most
+    relevant first, at most `top_k` items and `max_tokens` tokens (from the `knowledge`
+    settings by default). Items not embedded yet follow the ranked ones.
+    """
+    knowledge_conf = get_configuration().knowledge_config
+    top_k = knowledge_conf.top_k if top_k is None else top_k
+    max_tokens = knowledge_conf.max_tokens if max_tokens is None else max_tokens
+    index = ctx.context.knowledge
+    if not len(index):
+        return []
+    if index.pending:
+        await index_knowledge(ctx, [])
+
+    try:
+        question_embeddings = await _question_embeddings(ctx)
+        candidates = [k for k, _ in index.search(question_embeddings, top_k)]
+        candidates += index.pending[::-1][:top_k]
+    except Exception as e:
+        errors.inc(stage="embedding", error=type(e).__name__)
+        logger.error(f"Error ranking knowledge, using the latest items: {e}")
+        candidates = (index.items + index.pending)[::-1][:top_k]
+
+    model_name = get_configuration().get_model_config("planner").model_name
+    selected: List[Knowledge] = []
+    used = 0
+    for knowledge in candidates:
+        tokens = count_tokens(str(knowledge), model_name)
+        if used + tokens > max_tokens:
+            continue
+        selected.append(knowledge)
+        used += tokens
+    return selected
+
+
+async def list_out_relevant_knowledge(
+    ctx: RunContextWrapper[TaskContext],
+    top_k: int | None = None,
+    max_tokens: int | None = None,
+) -> str:
+    """
+    List out the knowledge most relevant to the current task's question for a prompt,
+    an empty string when there is none.
+    """
+    knowledges = await relevant_knowledge(ctx, top_k, max_tokens)
+    return ctx.context.current_task().list_out_knowledge(knowledges=knowledges)
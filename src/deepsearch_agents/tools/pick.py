@@ -5,7 +5,8 @@ from pydantic import BaseModel
 import asyncio
 
 from deepsearch_agents.context import Task, TaskContext, build_task_context
-from deepsearch_agents.llm.emb import get_embedding
+from deepsearch_agents.llm.emb import get_embedding, get_embeddings
+from deepsearch_agents.llm.tokens import count_tokens
 
 
 class PickResult(BaseModel):
@@ -13,6 +14,19 @@ class PickResult(BaseModel):
     score: float
 
 
+class SelectResult(BaseModel):
+    content: str
+    original_tokens: int
+    selected_tokens: int
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.original_tokens - self.selected_tokens
+
+
+_gap_marker = "\n...\n"
+
+
 async def pick_content(
     ctx: RunContextWrapper[TaskContext],
     content: str,
@@ -24,38 +38,119 @@ async def pick_content(
     and content windows. Returns the start index and score of the best matching window.
     """
 
-    curr_task = ctx.context.current_task()
-    question_embeddings = curr_task.question_embeddings
+    question_embeddings = await _question_embeddings(ctx)
     window_size = max_length // window_step
-    if question_embeddings is None:
-        question_embeddings = await _get_embeddings(ctx, "embedding", curr_task.query)
-        curr_task.question_embeddings = question_embeddings
-
-    # Create tasks for parallel embedding computation
-    tasks = []
-    for i in range(0, len(content) - window_size * window_step, window_size):
-        window_content = content[i : i + window_size]
-        tasks.append(_get_embeddings(ctx, "embedding", window_content))
-
-    # Run all embedding tasks in parallel
-    content_embeddings_list = await asyncio.gather(*tasks)
-
-    similarity_scores = [
-        _cosine_similarity(question_embeddings, content_emb)
-        for content_emb in content_embeddings_list
+
+    windows = [
+        content[i : i + window_size]
+        for i in range(0, len(content) - window_size * window_step, window_size)
     ]
-    window_similarity_scores: List[float] = []
-    for i in range(len(similarity_scores)):
-        window_score = np.mean(similarity_scores[i : i + window_size - 1])
-        window_similarity_scores.append(window_score)  # type: ignore
+    # Embed all windows in as few requests as possible
+    content_embeddings_list = await _get_embeddings_batch(ctx, "embedding", windows)
+
+    if not content_embeddings_list:
+        # the content fits in max_length, nothing to pick from
+        return PickResult(start=0, score=0.0)
+
+    # A picked section of max_length spans window_step consecutive windows
+    window_similarity_scores = score_windows(
+        question_embeddings, content_embeddings_list, window_step
+    )
 
     # Find the best snippet with the highest score
-    max_score = max(window_similarity_scores)
-    best_start_index = window_similarity_scores.index(max_score)
+    best_start_index = int(np.argmax(window_similarity_scores))
+    max_score = float(window_similarity_scores[best_start_index])
 
     return PickResult(start=best_start_index * window_size, score=max_score)
 
 
+async def select_content(
+    ctx: RunContextWrapper[TaskContext],
+    content: str,
+    max_tokens: int,
+    region_length: int,
+    model_name: str,
+    max_ranked_chars: int | None = None,
+) -> SelectResult:
+    """
+    Fit the content into a token budget. When it doesn't fit, split it into regions, rank them by
+    embedding similarity to the task query and keep the highest-scoring regions that fit, in their original order.
+    Only the first `max_ranked_chars` characters are ranked, which bounds the embedding cost of a huge page.
+    """
+    original_tokens = count_tokens(content, model_name)
+    if original_tokens <= max_tokens:
+        return SelectResult(
+            content=content,
+            original_tokens=original_tokens,
+            selected_tokens=original_tokens,
+        )
+
+    if max_ranked_chars is not None:
+        content = content[:max_ranked_chars]
+    regions = [
+        content[i : i + region_length] for i in range(0, len(content), region_length)
+    ]
+    question_embeddings = await _question_embeddings(ctx)
+    region_embeddings = await _get_embeddings_batch(ctx, "embedding", regions)
+    scores = score_windows(question_embeddings, region_embeddings, 1)
+
+    gap_tokens = count_tokens(_gap_marker, model_name)
+    kept: List[int] = []
+    used = 0
+    for i in np.argsort(-scores, kind="stable"):
+        tokens = count_tokens(regions[i], model_name) + gap_tokens
+        if used + tokens <= max_tokens:
+            kept.append(int(i))
+            used += tokens
+    kept.sort()
+
+    selected = ""
+    for prev, i in zip([-1] + kept, kept):
+        if i != prev + 1:
+            selected += _gap_marker
+        selected += regions[i]
+    return SelectResult(
+        content=selected,
+        original_tokens=original_tokens,
+        selected_tokens=count_tokens(selected, model_name),
+    )
+
+
+def score_windows(
+    question_embeddings: List[float],
+    content_embeddings: List[List[float]],
+    span: int,
+) -> np.ndarray:
+    """
+    Score every section of `span` consecutive windows by the mean cosine similarity
+    between its windows and the question. Sections near the end cover fewer windows.
+
+    All similarities are computed with one matrix-vector product over pre-normalized
+    vectors, and the sliding means come from a cumulative sum, so the cost is O(n·d)
+    regardless of `span`.
+    """
+    matrix = np.asarray(content_embeddings, dtype=np.float32)
+    question = np.asarray(question_embeddings, dtype=np.float32)
+    matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+    question /= max(float(np.linalg.norm(question)), 1e-12)
+    similarities = matrix @ question
+
+    n = len(similarities)
+    starts = np.arange(n)
+    ends = np.minimum(starts + max(span, 1), n)
+    cumsum = np.concatenate(([0.0], np.cumsum(similarities, dtype=np.float64)))
+    return (cumsum[ends] - cumsum[starts]) / (ends - starts)
+
+
+async def _question_embeddings(ctx: RunContextWrapper[TaskContext]) -> List[float]:
+    curr_task = ctx.context.current_task()
+    if curr_task.question_embeddings is None:
+        curr_task.question_embeddings = await _get_embeddings(
+            ctx, "embedding", curr_task.query
+        )
+    return curr_task.question_embeddings
+
+
 async def _get_embeddings(
     ctx: RunContextWrapper[TaskContext], model: str, text: str
 ) -> List[float]:
@@ -64,9 +159,9 @@ async def _get_embeddings(
     return response.embedding
 
 
-def _cosine_similarity(
-    question_embeddings: List[float], content_embeddings: List[float]
-) -> float:
-    return np.dot(question_embeddings, content_embeddings) / (
-        np.linalg.norm(question_embeddings) * np.linalg.norm(content_embeddings)
-    )
+async def _get_embeddings_batch(
+    ctx: RunContextWrapper[TaskContext], model: str, texts: List[str]
+) -> List[List[float]]:
+    response = await get_embeddings(model=model, texts=texts)
+    ctx.usage.add(response.usage)
+    return response.embeddings
@@ -0,0 +1,87 @@
+import math
+import re
+from collections import Counter
+from typing import List, Sequence
+
+import numpy as np
+
+
+def _terms(text: str) -> List[str]:
+    return re.findall(r"\w+", text.lower())
+
+
+def lexical_scores(query: str, texts: Sequence[str]) -> np.ndarray:
+    """
+    BM25 scores of texts for a query, with document frequencies taken from the texts themselves.
+    """
+    docs = [_terms(text) for text in texts]
+    if not docs:
+        return np.zeros(0)
+    k1, b = 1.2, 0.75
+    avg_len = sum(len(doc) for doc in docs) / len(docs) or 1.0
+    df = Counter(term for doc in docs for term in set(doc))
+    scores = np.zeros(len(docs))
+    for i, doc in enumerate(docs):
+        tf = Counter(doc)
+        for term in set(_terms(query)):
+            if term not in tf:
+                continue
+            idf = math.log(1 + (len(docs) - df[term] + 0.5) / (df[term] + 0.5))
+            norm = tf[term] + k1 * (1 - b + b * len(doc) / avg_len)
+            scores[i] += idf * tf[term] * (k1 + 1) / norm
+    return scores
+
+
+def lexical_similarity(texts: Sequence[str]) -> np.ndarray:
+    """
+    Pairwise Jaccard similarity of the terms of texts.
+    """
+    sets = [set(_terms(text)) for text in texts]
+    n = len(sets)
+    similarity = np.zeros((n, n))
+    for i in range(n):
+        for j in range(i, n):
+            union = len(sets[i] | sets[j])
+            similarity[i, j] = similarity[j, i] = (
+                len(sets[i] & sets[j]) / union if union else 0.0
+            )
+    return similarity
+
+
+def cosine_similarity(
+    question: Sequence[float], vectors: Sequence[Sequence[float]]
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Cosine similarity of every vector to the question, and between every pair of vectors.
+    """
+    matrix = np.asarray(vectors, dtype=np.float32)
+    matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+    q = np.asarray(question, dtype=np.float32)
+    q /= max(float(np.linalg.norm(q)), 1e-12)
+    return matrix @ q, matrix @ matrix.T
+
+
+def mmr(
+    relevance: np.ndarray, similarity: np.ndarray, k: int, diversity: float
+) -> List[int]:
+    """
+    Select k items by maximal marginal relevance: each pick maximizes its relevance minus
+    `diversity` times its similarity to the items already picked. Returns indexes in
+    order of selection.
+    """
+    if len(relevance) == 0:
+        return []
+    # scale relevance to [0, 1], so that it weighs like the similarity it is traded against
+    spread = relevance.max() - relevance.min()
+    relevance = (relevance - relevance.min()) / spread if spread else relevance * 0
+    selected: List[int] = []
+    redundancy = np.zeros(len(relevance))
+    candidates = np.ones(len(relevance), dtype=bool)
+    for _ in range(min(k, len(relevance))):
+        scores = (1 - diversity) * relevance - diversity * redundancy
+        scores[~candidates] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        candidates[best] = False
+        redundancy = np.maximum(redundancy, similarity[best])
+    return selected
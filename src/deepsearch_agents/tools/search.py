@@ -1,9 +1,13 @@
 from abc import ABC, abstractmethod
+import asyncio
+import json
+import os
+import re
+import textwrap
+import time
 from typing import Any, Callable, Generic, List, Optional
 from openai import AsyncOpenAI
 from pydantic import BaseModel
-import requests
-import serpapi
 from typing_extensions import TypedDict
 
 from agents import (
@@ -16,10 +20,27 @@ from agents import (
     function_tool,
 )
 
+from deepsearch_agents.cache import (
+    Cache,
+    DiskCache,
+    MemoryCache,
+    TieredCache,
+    register_cache,
+)
 from deepsearch_agents.log import logger
 from deepsearch_agents.conf import get_configuration
 from deepsearch_agents.context import TaskContext
-from ._utils import log_action, tool_instructions
+from deepsearch_agents.metrics import errors
+from deepsearch_agents.resilience import retry
+from ._http import default_timeout, get_http_client
+from ._utils import canonicalize_url, cap_tool_output, log_action, tool_instructions
+from deepsearch_agents.tools.pick import _get_embeddings_batch, _question_embeddings
+from deepsearch_agents.tools.rerank import (
+    cosine_similarity,
+    lexical_scores,
+    lexical_similarity,
+    mmr,
+)
 from deepsearch_agents.tools.rewrite import rewrite_search_query
 
 
@@ -37,6 +58,8 @@ tool_instructions["search"] = search_description
 
 TOTAL_SEARCH_RESULTS = 25
 
+SERPAPI_ENDPOINT = "https://serpapi.com/search.json"
+
 
 class SearchResult(BaseModel):
     """
@@ -53,7 +76,7 @@ class SearchResult(BaseModel):
 @function_tool()
 async def search(
     ctx: RunContextWrapper[TaskContext], think: str, search_queries: List[str]
-) -> list[SearchResult]:
+) -> str:
     """
     - Perform a search
     - Search query should be search engine-friendly, concise, using relevant keywords, avoiding unnecessary stop words.
@@ -65,27 +88,202 @@ async def search(
 
     log_action(ctx, "search", think, search_queries=search_queries)  # type: ignore
     if search_queries is None or len(search_queries) == 0:
-        return []
+        return render_results([])
     queries = await rewrite_search_query(ctx, search_queries)
 
     # logger.info(f"Rewrite original query: {search_queries}\n ->\n {queries}")
 
-    res: list[SearchResult] = []
-    for query in queries.queries:
-        r = _search(query, TOTAL_SEARCH_RESULTS // len(queries.queries))
-        res.extend(r)
-    reranked_ret = _rerank(res)
+    res = await _search_all(
+        queries.queries, TOTAL_SEARCH_RESULTS // len(queries.queries)
+    )
+    return render_results(await _rerank(ctx, res))
+
+
+def render_results(results: List[SearchResult]) -> str:
+    """
+    Render search results for the planner: one numbered line per result, the snippet
+    shortened and empty fields left out.
+    """
+    if not results:
+        return "No results found, try other search queries."
+    snippet_chars = get_configuration().tool_output_config.snippet_chars
+    lines = []
+    for i, r in enumerate(results, 1):
+        snippet = textwrap.shorten(r.snippet, snippet_chars, placeholder="...")
+        fields = [r.title, r.link, r.date, r.source, snippet]
+        lines.append(f"{i}. " + " | ".join(f for f in fields if f))
+    return cap_tool_output(
+        "search",
+        f"{len(results)} results (title | link | date and source when known | snippet):",
+        lines,
+    )
+
+
+async def _rerank(
+    ctx: RunContextWrapper[TaskContext], results: List[SearchResult]
+) -> List[SearchResult]:
+    """
+    Merge the results linking to the same page, score the rest by the similarity of their
+    title and snippet to the task's question, and keep the most relevant ones while
+    skipping near duplicates of those already kept.
+    Falls back to lexical scoring when the results can't be embedded.
+    """
+    search_conf = get_configuration().search_config
+    unique: dict[str, SearchResult] = {}
+    for result in results:
+        unique.setdefault(canonicalize_url(result.link), result)
+    candidates = list(unique.values())
+    if len(candidates) <= 1:
+        return candidates
+
+    texts = [f"{r.title}\n{r.snippet}" for r in candidates]
+    try:
+        question_embeddings = await _question_embeddings(ctx)
+        embeddings = await _get_embeddings_batch(ctx, "embedding", texts)
+        relevance, similarity = cosine_similarity(question_embeddings, embeddings)
+    except Exception as e:
+        errors.inc(stage="embedding", error=type(e).__name__)
+        logger.warning(f"Error embedding search results, ranking them lexically: {e}")
+        relevance = lexical_scores(ctx.context.current_task().query, texts)
+        similarity = lexical_similarity(texts)
+
+    selected = mmr(relevance, similarity, search_conf.top_k, search_conf.diversity)
+    logger.info(
+        f"Reranked {len(results)} search results: {len(candidates)} unique pages, "
+        f"kept {len(selected)}"
+    )
+    return [candidates[i] for i in selected]
+
+
+async def _search_all(queries: List[str], max_results: int) -> List[SearchResult]:
+    """
+    Issue all queries concurrently and merge the results as they arrive.
+    A query that fails or exceeds its timeout is dropped, it doesn't fail the whole search.
+    """
+    res: List[SearchResult] = []
+    for completed in asyncio.as_completed(
+        [_search_with_timeout(query, max_results) for query in queries]
+    ):
+        res.extend(await completed)
+    return res
+
+
+async def _search_with_timeout(query: str, max_results: int) -> List[SearchResult]:
+    timeout = get_configuration().search_config.timeout
+    try:
+        return await asyncio.wait_for(_search(query, max_results), timeout)
+    except asyncio.TimeoutError:
+        errors.inc(stage="search", error="TimeoutError")
+        logger.warning(f"Search query {query} timed out after {timeout}s")
+    except Exception as e:
+        errors.inc(stage="search", error=type(e).__name__)
+        logger.error(f"Error searching query {query}: {e}")
+    return []
+
+
+_serp_cache: Cache | None = None
+
+SERP_CACHE_VERSION = 2
+"""Version of the search cache keys, bumped when `normalize_query` changes so that results
+cached under the old keys are not served"""
+
+_time_sensitive = re.compile(
+    r"\b(today|yesterday|tonight|now|latest|breaking|current(ly)?|recent(ly)?|"
+    r"this (week|month|year)|last \d* ?(hours?|days?|weeks?|months?))\b",
+    re.IGNORECASE,
+)
+
+
+def get_serp_cache() -> Cache | None:
+    """
+    Get the search result cache: an in-memory LRU, optionally backed by a persistent cache.
+    Returns None when caching is disabled.
+    """
+    global _serp_cache
+    cache_conf = get_configuration().cache_config
+    if not cache_conf.enabled:
+        return None
+    if _serp_cache is None:
+        tiers: List[Cache] = [
+            MemoryCache(max_items=cache_conf.serp_memory_items, ttl=cache_conf.serp_ttl)
+        ]
+        if cache_conf.serp_disk:
+            tiers.append(
+                DiskCache(
+                    os.path.join(
+                        cache_conf.directory, f"serp.v{SERP_CACHE_VERSION}.sqlite"
+                    ),
+                    max_bytes=cache_conf.serp_max_bytes,
+                    ttl=cache_conf.serp_ttl,
+                )
+            )
+        _serp_cache = register_cache("serp", TieredCache(*tiers))
+    return _serp_cache
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a search query so that case and whitespace differences map to the same
+    cache key. Punctuation ("C++", "C#") and word order ("nyc to la") change the
+    results, so they are kept.
+    """
+    return " ".join(query.lower().split())
+
+
+def is_time_sensitive(query: str) -> bool:
+    return bool(_time_sensitive.search(query))
+
+
+async def _search(
+    query: str, max_results: int, ttl: float | None = None
+) -> List[SearchResult]:
+    """
+    Search a query, served from the search cache when possible.
+
+    Args:
+        ttl: Freshness of the cached results in seconds, time-sensitive queries
+            default to a short TTL.
+    """
+    cache = get_serp_cache()
+    if cache is None:
+        return (await _serpapi_search_with_retry(query))[:max_results]
+
+    key = normalize_query(query)
+    cached = cache.get(key)
+    if cached is not None:
+        return [
+            SearchResult.model_validate(r) for r in json.loads(cached)[:max_results]
+        ]
 
-    return reranked_ret[:TOTAL_SEARCH_RESULTS]
+    start = time.perf_counter()
+    results = await _serpapi_search_with_retry(query)
+    cache.stats.observe_miss_latency(time.perf_counter() - start)
+    if ttl is None and is_time_sensitive(query):
+        ttl = get_configuration().cache_config.serp_time_sensitive_ttl
+    cache.set(key, json.dumps([r.model_dump() for r in results]).encode(), ttl)
+    return results[:max_results]
 
 
-def _rerank(results: List[SearchResult]) -> List[SearchResult]:
-    return results
+async def _serpapi_search_with_retry(query: str) -> List[SearchResult]:
+    # the whole query, retries included, is bounded by the search timeout of `_search_with_timeout`
+    return await retry(lambda: _serpapi_search(query), name=f"Search query {query}")
 
 
-def _search(query: str, max_results: int) -> List[SearchResult]:
+async def _serpapi_search(query: str) -> List[SearchResult]:
     config = get_configuration()
-    r = serpapi.search(
-        q=query, engine="google", hl="en", gl="us", api_key=config.serpapi_api_key
+    response = await get_http_client().get(
+        SERPAPI_ENDPOINT,
+        params={
+            "q": query,
+            "engine": "google",
+            "hl": "en",
+            "gl": "us",
+            "api_key": config.serpapi_api_key,
+        },
+        timeout=default_timeout(read=config.search_config.timeout),
     )
-    return [SearchResult(**r) for r in r["organic_results"][:max_results]]
+    response.raise_for_status()
+    r = response.json()
+    if "error" in r:
+        raise ValueError(f"Search request failed for {query}: {r['error']}")
+    return [SearchResult(**r) for r in r.get("organic_results", [])]
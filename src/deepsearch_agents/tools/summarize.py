@@ -3,8 +3,10 @@ from typing import List, Literal
 from agents import RunContextWrapper
 from pydantic import BaseModel
 
+from deepsearch_agents import conf
 from deepsearch_agents.context import TaskContext, build_task_context
 from deepsearch_agents.llm.llm import get_response
+from deepsearch_agents.llm.tokens import count_tokens
 
 
 SUMMARIZE_PROMPT = """
@@ -34,6 +36,8 @@ class SummarizeResult(BaseModel):
 
 MAX_SUMMARY_LENGTH = 5
 
+_input_prefix = "the web page content is: \n"
+
 
 async def summarize(
     ctx: RunContextWrapper[TaskContext], query: str, origin_query: str, content: str
@@ -43,18 +47,36 @@ async def summarize(
     """
     ret = await get_response(
         model="summarize",
-        input=f"the web page content is: \n{content}",
+        input=f"{_input_prefix}{content}",
         output_type=SummarizeResult,
-        system_instructions=SUMMARIZE_PROMPT.format(
-            query_content=query_content(origin_query, query),
-            query=query,
-            max_summary_length=MAX_SUMMARY_LENGTH,
-        ),
+        system_instructions=_instructions(query, origin_query),
+        trim=True,
     )
     ctx.usage.add(ret.usage)
     return ret.response
 
 
+def content_token_budget(query: str, origin_query: str) -> int | None:
+    """
+    How many tokens of page content fit into one summarize call, None means no limit.
+    """
+    model_conf = conf.get_configuration().get_model_config("summarize")
+    if model_conf.max_input_tokens is None:
+        return None
+    prompt_tokens = count_tokens(
+        _instructions(query, origin_query) + _input_prefix, model_conf.model_name
+    )
+    return max(model_conf.max_input_tokens - prompt_tokens, 0)
+
+
+def _instructions(query: str, origin_query: str) -> str:
+    return SUMMARIZE_PROMPT.format(
+        query_content=query_content(origin_query, query),
+        query=query,
+        max_summary_length=MAX_SUMMARY_LENGTH,
+    )
+
+
 def query_content(origin_query: str, query: str) -> str:
     if origin_query == query:
         return query
@@ -1,25 +1,36 @@
 import asyncio
 import datetime
+import os
 import re
+import time
 from typing import Dict, List, Literal, Optional
 from pydantic import BaseModel
-import requests
 
 from agents import RunContextWrapper, function_tool
 
+from deepsearch_agents.cache import Cache, DiskCache, register_cache
 from deepsearch_agents.conf import get_configuration
 from deepsearch_agents.log import logger
+from deepsearch_agents.metrics import errors
+from deepsearch_agents.resilience import RETRYABLE_STATUS, hedged, retry
 from deepsearch_agents.context import (
     Knowledge,
     Reference,
     TaskContext,
     build_task_context,
 )
+from deepsearch_agents.tools._http import default_timeout, fetch_slot, get_http_client
 from deepsearch_agents.tools._utils import (
+    canonicalize_url,
+    cap_tool_output,
     log_action,
     remove_markdown_link,
+    stage_semaphore,
     tool_instructions,
 )
+from deepsearch_agents.tools.knowledge import index_knowledge
+from deepsearch_agents.tools.pick import select_content
+from deepsearch_agents.tools.summarize import content_token_budget, summarize
 
 
 class PageContent(BaseModel):
@@ -53,61 +64,231 @@ async def visit(
         think: A very concise explain of why choose to visit these URLs.
         urls: Must be an array of URLs, choose up to 5 URLs to visit
     """
-    knowledges: List[Knowledge] = []
     log_action(ctx, "visit", think, urls=urls)  # type: ignore
-    urls_to_process = urls[:5]
+    task = ctx.context.current_task()
+    urls_to_process: List[str] = []
+    duplicates: List[str] = []
+    keys: set[str] = set()
+    for url in urls[:5]:
+        key = canonicalize_url(url)
+        if key in task.visited_urls:
+            duplicates.append(url)
+        elif key not in keys:
+            keys.add(key)
+            urls_to_process.append(url)
+    if duplicates:
+        logger.info(f"Skipping {len(duplicates)} URLs already visited: {duplicates}")
+    if not urls_to_process:
+        return f"You have already visited all of these URLs: {', '.join(duplicates)}. Their content is in your knowledge, visit other URLs or answer."
+    registry = ctx.context.urls
+    failed: List[str] = []
 
-    # 创建所有URL的任务列表
-    tasks = []
+    async def visit_url(url: str) -> Knowledge | None:
+        key = canonicalize_url(url)
+        try:
+            knowledge = await registry.visit(
+                key, task.query, lambda: _visit_url(ctx, url)
+            )
+        except Exception:
+            # logged by _visit_url, the URL is not marked visited so it can be retried
+            failed.append(url)
+            return None
+        # read: either a knowledge was found or the page was judged not useful
+        task.visited_urls.add(key)
+        return knowledge
 
-    for url in urls_to_process:
-        tasks.append(fetch_url(url))
+    # each page moves on to picking and summarizing as soon as it is fetched
+    knowledges: List[Knowledge] = []
+    start = time.perf_counter()
+    first_knowledge_at: float | None = None
+    for completed in asyncio.as_completed([visit_url(url) for url in urls_to_process]):
+        knowledge = await completed
+        if knowledge is None:
+            continue
+        if first_knowledge_at is None:
+            first_knowledge_at = time.perf_counter() - start
+        knowledges.append(knowledge)
+        task.knowledges.append(knowledge)
+        ctx.context.emit("knowledge_added", **knowledge.model_dump(mode="json"))
+    await index_knowledge(ctx, knowledges)
+    ttfk = f"{first_knowledge_at:.2f}s" if first_knowledge_at is not None else "n/a"
+    logger.info(
+        f"Visited {len(urls_to_process)} URLs in {time.perf_counter() - start:.2f}s, "
+        f"{len(knowledges)} knowledges, time to first knowledge: {ttfk}"
+    )
 
-    # 并发执行所有任务
-    results: List[PageContent | BaseException] = await asyncio.gather(
-        *tasks, return_exceptions=True
+    return render_knowledges(
+        len(urls_to_process) - len(failed), knowledges, duplicates, failed
     )
 
-    availables = {}
-    for url, result in zip(urls_to_process, results):
-        if isinstance(result, BaseException):
-            logger.error(f"Error processing URL {url}: {result}")
-        elif result.warning:
-            logger.warning(f"URL {url}, warning, {result.warning}")
-        else:
-            availables[url] = result
-
-    ctx.context.current_task().knowledges.extend(knowledges)
-
-    content_str = "\n".join(
-        [
-            f"URL: {k.reference.url}\nPublication Date: {k.reference.datetime}\nSummary: {k.summary}"
-            for k in knowledges
-        ]
+
+def render_knowledges(
+    visited: int,
+    knowledges: List[Knowledge],
+    duplicates: List[str],
+    failed: List[str] | None = None,
+) -> str:
+    """
+    Render the result of a visit for the planner: a short header, then the source
+    and summary of each knowledge found.
+    """
+    skipped = (
+        f" Skipped {len(duplicates)} URLs you have already visited: {', '.join(duplicates)}."
+        if duplicates
+        else ""
+    )
+    if failed:
+        skipped += f" Could not read {len(failed)} URLs, they may be retried: {', '.join(failed)}."
+    if not knowledges:
+        return f"Visited {visited} URLs, found nothing useful. Maybe try another set of URLs.{skipped}"
+    entries = [
+        f"[{i}] {k.reference.url}"
+        + (f" ({k.reference.datetime})" if k.reference.datetime else "")
+        + f"\n{k.summary}"
+        for i, k in enumerate(knowledges, 1)
+    ]
+    return cap_tool_output(
+        "visit",
+        f"Visited {visited} URLs, {len(knowledges)} of them contain clues to answer the question.{skipped}",
+        entries,
     )
-    if len(knowledges) > 0:
-        return f"""
-        Successfully visited {len(urls_to_process)} URLs, {len(knowledges)} of them contain clues to answer the question.
-        Here are the details:
-        {content_str}
-        """
-    else:
-        return f"""
-        Try to visit {len(urls_to_process)} URLs, but found nothing useful. Maybe try another set of URLs.
-        """
+
+
+async def _visit_url(
+    ctx: RunContextWrapper[TaskContext], url: str
+) -> Knowledge | None:
+    """
+    Fetch a page, pick its most relevant section and summarize it into a Knowledge.
+    Returns None if the page is not useful. Fetch and summarize errors are raised, so
+    that the shared visit of the page is not kept and a later visit retries it.
+    """
+    visit_conf = get_configuration().visit_config
+    try:
+        page = await ctx.context.urls.fetch(
+            canonicalize_url(url), lambda: fetch_url(url)
+        )
+    except Exception as e:
+        errors.inc(stage="fetch", error=type(e).__name__)
+        logger.error(f"Error processing URL {url}: {e}")
+        raise
+    if page.warning:
+        logger.warning(f"URL {url}, warning, {page.warning}")
+        return None
+
+    try:
+        task = ctx.context.current_task()
+        content = f"{page.title}\n{page.description}\n{page.content}"
+        budget = content_token_budget(task.query, task.origin_query)
+        if budget is not None:
+            async with stage_semaphore("pick", visit_conf.pick_concurrency):
+                selected = await select_content(
+                    ctx,
+                    content,
+                    budget,
+                    visit_conf.region_length,
+                    get_configuration().get_model_config("summarize").model_name,
+                    visit_conf.max_ranked_chars,
+                )
+            if selected.saved_tokens:
+                logger.info(
+                    f"URL {url}: kept {selected.selected_tokens} of {selected.original_tokens} tokens, "
+                    f"saved {selected.saved_tokens} tokens"
+                )
+            content = selected.content
+
+        async with stage_semaphore("summarize", visit_conf.summarize_concurrency):
+            result = await summarize(ctx, task.query, task.origin_query, content)
+    except Exception as e:
+        errors.inc(stage="summarize", error=type(e).__name__)
+        logger.error(f"Error summarizing URL {url}: {e}")
+        raise
+
+    if result.evaluate != "useful":
+        logger.info(f"URL {url} is {result.evaluate}: {result.reason}")
+        return None
+    return Knowledge(
+        reference=Reference(url=url, title=page.title, datetime=result.datetime),
+        quotes=result.quotes,
+        summary=result.summarize,
+    )
+
+
+_page_cache: Cache | None = None
+
+PAGE_CACHE_VERSION = 3
+"""Version of the page cache keys, bumped when `canonicalize_url` changes so that pages
+cached under the old keys are not served"""
+
+
+def get_page_cache() -> Cache | None:
+    """
+    Get the persistent cache of fetched pages, keyed by canonicalized URL.
+    Returns None when caching is disabled.
+    """
+    global _page_cache
+    cache_conf = get_configuration().cache_config
+    if not cache_conf.enabled:
+        return None
+    if _page_cache is None:
+        _page_cache = register_cache(
+            "page",
+            DiskCache(
+                os.path.join(
+                    cache_conf.directory, f"pages.v{PAGE_CACHE_VERSION}.sqlite"
+                ),
+                max_bytes=cache_conf.page_max_bytes,
+                ttl=cache_conf.page_ttl,
+            ),
+        )
+    return _page_cache
 
 
 async def fetch_url(url: str) -> PageContent:
     """
-    - Crawl and read full content from URLs
+    - Crawl and read full content from URLs, served from the page cache when possible
     """
+    cache = get_page_cache()
+    if cache is None:
+        return await _fetch_page(url)
+
+    key = canonicalize_url(url)
+    cached = cache.get(key)
+    if cached is not None:
+        return PageContent.model_validate_json(cached)
+
+    start = time.perf_counter()
+    page = await _fetch_page(url)
+    cache.stats.observe_miss_latency(time.perf_counter() - start)
+    if not page.warning:
+        cache.set(key, page.model_dump_json().encode())
+    return page
+
+
+async def _fetch_page(url: str) -> PageContent:
+    """
+    Fetch a page, retrying transient errors and hedging slow tail fetches with a duplicate request.
+    """
+    return await retry(
+        lambda: hedged(lambda: _fetch_from_jina(url), name="fetch"),
+        name=f"Fetch {url}",
+        deadline=get_configuration().retry_config.fetch_deadline,
+    )
+
+
+async def _fetch_from_jina(url: str) -> PageContent:
     config = get_configuration()
     url = f"https://r.jina.ai/{url}"
     headers = {
         "Authorization": f"Bearer {config.jina_api_key}",
         "Accept": "application/json",
     }
-    response = requests.get(url, headers=headers).json()
+    async with fetch_slot():
+        http_response = await get_http_client().get(
+            url, headers=headers, timeout=default_timeout()
+        )
+    if http_response.status_code in RETRYABLE_STATUS:
+        http_response.raise_for_status()
+    response = http_response.json()
 
     if response.get("code") != 200:
         message = response.get("message", "Unknown error occurred while fetching URL")